@@ -1,46 +1,759 @@
+# sklearn y joblib se importan dentro de las funciones que los usan: importarlos tarda más
+# de un segundo y el backend 'lite' puntúa solo con NumPy
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-import joblib
+import copy
 import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
 from datetime import datetime
+from itertools import islice
 import json
+from recommendations import SkillIndex, canonical_skill
+from model_registry import ModelRegistry
+from cv_worker import evaluate_fold, spawn_without_main
+from lite_backend import LiteTfidfVectorizer, TfidfRows, cosine
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+class RowRecord:
+    """Adaptador de una fila de SQLite nativo (dict) a la interfaz de los modelos ORM"""
+    
+    def __init__(self, row, company=None):
+        self.__dict__.update(row)
+        self.company = company
+    
+    def _json_list(self, field):
+        value = self.__dict__.get(field)
+        return json.loads(value) if value else []
+    
+    def get_skills_technical(self):
+        return self._json_list('skills_technical')
+    
+    def get_skills_soft(self):
+        return self._json_list('skills_soft')
+    
+    def get_interests(self):
+        return self._json_list('interests')
+    
+    def get_languages(self):
+        return self._json_list('languages')
+    
+    def get_experience(self):
+        return self._json_list('experience')
+    
+    def get_required_skills(self):
+        return self._json_list('required_skills')
+    
+    def get_required_careers(self):
+        return self._json_list('required_careers')
+    
+    def get_benefits(self):
+        return self._json_list('benefits')
+
+class StudentProfile:
+    """Lado del estudiante ya decodificado: listas, vector numérico, texto y factores"""
+    
+    def __init__(self, skills_technical, skills_soft, interests, languages, experience,
+                 features, text, completeness, factors):
+        self.skills_technical = skills_technical
+        self.skills_soft = skills_soft
+        self.interests = interests
+        self.languages = languages
+        self.experience = experience
+        self.features = features
+        self.vector = np.array(list(features.values()), dtype=np.float32)
+        self.vector.setflags(write=False)
+        self.text = text
+        self.completeness = completeness
+        self.factors = factors
+
+class FeatureCache:
+    """Caché LRU de perfiles de estudiante con clave (id, updated_at)
+    
+    Al cambiar updated_at la entrada anterior del estudiante se descarta.
+    """
+    
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.keys_by_id = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def get_or_build(self, key, builder):
+        """Obtiene el valor en caché o lo construye con builder()"""
+        if key is None or self.maxsize <= 0:
+            with self.lock:
+                self.misses += 1
+            return builder()
+        
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+        
+        value = builder()
+        
+        with self.lock:
+            self.misses += 1
+            stale_key = self.keys_by_id.get(key[0])
+            if stale_key is not None and stale_key != key:
+                self.entries.pop(stale_key, None)
+            self.entries[key] = value
+            self.keys_by_id[key[0]] = key
+            while len(self.entries) > self.maxsize:
+                evicted_key, _ = self.entries.popitem(last=False)
+                if self.keys_by_id.get(evicted_key[0]) == evicted_key:
+                    del self.keys_by_id[evicted_key[0]]
+        return value
+    
+    def invalidate(self, student_id=None):
+        """Descarta un estudiante o toda la caché"""
+        with self.lock:
+            if student_id is None:
+                self.entries.clear()
+                self.keys_by_id.clear()
+            else:
+                key = self.keys_by_id.pop(student_id, None)
+                if key is not None:
+                    self.entries.pop(key, None)
+    
+    def stats(self):
+        """Estadísticas de uso de la caché"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+class ScoreCache:
+    """Caché LRU de scores de compatibilidad por par con un techo de memoria
+    
+    La clave (student_id, updated_at del estudiante, opportunity_id, updated_at de la
+    oportunidad, versión del modelo) cambia al editar cualquiera de las dos filas o al cambiar
+    de modelo, así que una entrada nunca queda desactualizada; las viejas salen por LRU.
+    """
+    
+    ENTRY_OVERHEAD = 100  # Bytes aproximados del nodo del OrderedDict y su ranura en la tabla
+    
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # clave -> (score, bytes de la entrada)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    @staticmethod
+    def key_for(student, opportunity, model_version):
+        """Clave del par o None si alguna fila no tiene id"""
+        student_id = getattr(student, 'id', None)
+        opportunity_id = getattr(opportunity, 'id', None)
+        if student_id is None or opportunity_id is None:
+            return None
+        return (student_id, getattr(student, 'updated_at', None),
+                opportunity_id, getattr(opportunity, 'updated_at', None), model_version)
+    
+    def get_or_compute(self, key, compute):
+        """Score en caché o calculado con compute()"""
+        if key is None or self.max_bytes <= 0:
+            return compute()
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        
+        score = compute()
+        size = sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) \
+            + sys.getsizeof(score) + self.ENTRY_OVERHEAD
+        
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self.entries[key] = (score, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self.entries:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return score
+    
+    def clear(self):
+        """Descarta todas las entradas (p. ej. al cambiar de modelo)"""
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+            self.invalidations += 1
+    
+    def stats(self):
+        """Estadísticas de uso de la caché"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+def make_vectorizer(backend='full'):
+    """Vectorizador TF-IDF del backend elegido ('full' usa sklearn, 'lite' solo NumPy)"""
+    if backend == 'lite':
+        return LiteTfidfVectorizer(max_features=1000)
+    
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(max_features=1000, stop_words='english')
+
+class SemanticIndex:
+    """Índice TF-IDF del catálogo de oportunidades ajustado una sola vez"""
+    
+    def __init__(self, opportunities, opportunity_texts, backend='full'):
+        self.opportunity_ids = [opportunity.id for opportunity in opportunities]
+        self.positions = {opp_id: position for position, opp_id in enumerate(self.opportunity_ids)}
+        self.vectorizer = make_vectorizer(backend)
+        
+        try:
+            # Las filas quedan normalizadas (L2), por lo que el producto punto es la similitud coseno
+            self.matrix = self.vectorizer.fit_transform(opportunity_texts)
+        except ValueError:
+            # Catálogo vacío o sin vocabulario útil
+            self.matrix = None
+    
+    def __len__(self):
+        return len(self.opportunity_ids)
+    
+    def subset(self, positions):
+        """Vista del índice restringida a las posiciones dadas (comparte el vocabulario)"""
+        subset = copy.copy(self)
+        subset.opportunity_ids = [self.opportunity_ids[position] for position in positions]
+        subset.positions = {opp_id: position for position, opp_id in enumerate(subset.opportunity_ids)}
+        if self.matrix is not None:
+            subset.matrix = self.matrix[positions]
+        return subset
+    
+    def similarities(self, student_texts):
+        """Similitud coseno de un bloque de estudiantes contra todo el catálogo en un solo producto disperso"""
+        if self.matrix is None:
+            return np.zeros((len(student_texts), len(self.opportunity_ids)))
+        
+        # Los textos vacíos producen filas en cero, igual que la ruta por pares
+        student_vectors = self.vectorizer.transform(student_texts)
+        if isinstance(self.matrix, TfidfRows):
+            return self.matrix.dot(student_vectors)
+        return (student_vectors @ self.matrix.T).toarray()
+
+class StructuredIndex:
+    """Características estructuradas y requisitos del catálogo como arreglos de NumPy"""
+    
+    def __init__(self, opportunities, opportunity_features):
+        n_opportunities = len(opportunities)
+        n_features = len(opportunity_features[0]) if opportunity_features else 0
+        
+        self.features = np.array(
+            [list(features.values()) for features in opportunity_features], dtype=np.float32
+        ).reshape(n_opportunities, n_features)
+        self.required_semester = np.array(
+            [opportunity.required_semester or 0 for opportunity in opportunities], dtype=np.float64
+        )
+        self.required_credits = np.array(
+            [opportunity.required_credits or 0 for opportunity in opportunities], dtype=np.float64
+        )
+        
+        # Matriz de pertenencia oportunidad x carrera requerida
+        required_careers = [opportunity.get_required_careers() for opportunity in opportunities]
+        self.career_columns = {}
+        for careers in required_careers:
+            for career in careers:
+                self.career_columns.setdefault(career, len(self.career_columns))
+        
+        self.career_matrix = np.zeros((n_opportunities, len(self.career_columns)), dtype=bool)
+        for row, careers in enumerate(required_careers):
+            for career in careers:
+                self.career_matrix[row, self.career_columns[career]] = True
+        self.has_careers = self.career_matrix.any(axis=1)
+    
+    def subset(self, positions):
+        """Vista del índice restringida a las posiciones dadas"""
+        subset = copy.copy(self)
+        subset.features = self.features[positions]
+        subset.required_semester = self.required_semester[positions]
+        subset.required_credits = self.required_credits[positions]
+        subset.career_matrix = self.career_matrix[positions]
+        subset.has_careers = self.has_careers[positions]
+        return subset
+    
+    def similarities(self, student_vectors):
+        """Distancia euclidiana normalizada de un bloque de estudiantes contra todo el catálogo"""
+        n_students = student_vectors.shape[0]
+        if student_vectors.shape[1] != self.features.shape[1]:
+            # Igual que la ruta por pares: vectores de distinta dimensión no son comparables
+            return np.zeros((n_students, self.features.shape[0]))
+        
+        # |a - b|^2 = |a|^2 + |b|^2 - 2ab, sin materializar el tensor estudiantes x oportunidades x características
+        squared = (
+            np.square(student_vectors).sum(axis=1)[:, None] +
+            np.square(self.features).sum(axis=1)[None, :] -
+            2 * student_vectors @ self.features.T
+        )
+        distances = np.sqrt(np.maximum(squared, 0))
+        max_distance = np.sqrt(self.features.shape[1])
+        return np.maximum(0, 1 - distances / max_distance)
+    
+    def basic_requirements(self, semesters, credits, careers):
+        """Máscaras de semestre, créditos y carrera de un bloque de estudiantes contra todo el catálogo"""
+        semester_checked = self.required_semester != 0
+        credits_checked = self.required_credits != 0
+        
+        semester_ok = semester_checked & (semesters[:, None] >= self.required_semester)
+        credits_ok = credits_checked & (credits[:, None] >= self.required_credits)
+        
+        career_ok = np.zeros((len(careers), len(self.required_semester)), dtype=bool)
+        for row, career in enumerate(careers):
+            column = self.career_columns.get(career)
+            if column is not None:
+                career_ok[row] = self.career_matrix[:, column]
+        
+        total_checks = (
+            semester_checked.astype(np.int8) + credits_checked.astype(np.int8) + self.has_careers.astype(np.int8)
+        )
+        score = semester_ok.astype(np.int8) + credits_ok.astype(np.int8) + career_ok.astype(np.int8)
+        
+        return np.where(total_checks > 0, score / np.maximum(total_checks, 1), 1.0)
+
+class LSHIndex:
+    """Índice aproximado (LSH por hiperplanos aleatorios) sobre vectores TF-IDF normalizados
+    
+    Cada tabla asigna a cada oportunidad un código de n_bits con el signo de sus proyecciones;
+    vectores con ángulo pequeño comparten código con alta probabilidad. Las consultas unen los
+    buckets de todas las tablas (y los vecinos a distancia de Hamming 1 si probe=True).
+    
+    Con 16 tablas de 14 bits (evaluate_ann.py, catálogo sintético) la consulta más el
+    re-ordenamiento exacto de la lista corta (~1.2% del catálogo) es más lenta que el escaneo
+    completo en 20k oportunidades (recall@10 0.87), empata o gana por poco en 50k (0.96) y es
+    ~1.7x más rápida en 100k (0.98) y ~2.3x en 200k (0.96).
+    """
+    
+    def __init__(self, matrix, n_tables=16, n_bits=14, seed=42, probe=True):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.probe = probe
+        
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((matrix.shape[1], n_tables * n_bits)).astype(np.float32)
+        self.bit_weights = (1 << np.arange(n_bits)).astype(np.int64)
+        self.flips = np.array([0] + ([1 << bit for bit in range(n_bits)] if probe else []), dtype=np.int64)
+        
+        # Todas las tablas en un solo arreglo ordenado: la clave de cada oportunidad es su código
+        # desplazado por tabla (tabla * 2^n_bits + código), así una búsqueda cubre todas las tablas
+        # Las filas en cero (sin vocabulario) no se indexan: su similitud siempre es 0 y todas
+        # caerían en el código 0, formando un bucket enorme que inflaría las listas cortas
+        self.size = matrix.shape[0]
+        indexed = np.flatnonzero(np.diff(matrix.indptr) > 0)
+        self.table_offsets = (np.arange(n_tables, dtype=np.int64) << n_bits)[:, None]
+        keys = (self._codes(matrix[indexed] @ self.planes).T + self.table_offsets).ravel()
+        order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[order]
+        self.order = indexed[order % len(indexed)] if len(indexed) else order
+    
+    def _codes(self, projections):
+        projections = np.asarray(projections).reshape(-1, self.n_tables, self.n_bits)
+        return (projections > 0).astype(np.int64) @ self.bit_weights
+    
+    def query(self, vector):
+        """Posiciones candidatas (ordenadas) para un vector disperso de una fila"""
+        # Para una sola fila dispersa basta combinar los hiperplanos de sus términos presentes
+        projections = vector.data @ self.planes[vector.indices]
+        probes = ((self._codes(projections)[0][:, None] ^ self.flips[None, :]) + self.table_offsets).ravel()
+        starts = np.searchsorted(self.sorted_keys, probes, side='left')
+        lengths = np.searchsorted(self.sorted_keys, probes, side='right') - starts
+        
+        # Índices de todos los buckets visitados sin recorrerlos en Python: cada rango
+        # [start, start + length) se expande con un repeat más un arange acumulado
+        total = int(lengths.sum())
+        ends = np.cumsum(lengths)
+        steps = np.arange(total) - np.repeat(ends - lengths, lengths)
+        selected = np.zeros(self.size, dtype=bool)
+        selected[self.order[np.repeat(starts, lengths) + steps]] = True
+        return np.flatnonzero(selected)
+
+class FlatForest:
+    """Bosque aleatorio exportado a arreglos NumPy planos para inferencia vectorizada
+    
+    Los nodos de todos los árboles se concatenan (feature, threshold, hijos y probabilidades
+    de hoja; feature = -1 marca una hoja). Todas las filas avanzan un nivel a la vez en todos
+    los árboles y las que llegan a una hoja salen del conjunto activo.
+    """
+    
+    def __init__(self, feature, threshold, children, missing_left, value, roots, max_depth, classes_):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children  # Pares (derecho, izquierdo) por nodo: children[2 * nodo + va_a_la_izquierda]
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes_
+    
+    @classmethod
+    def from_model(cls, model):
+        """Exporta un RandomForestClassifier entrenado; None si el modelo no es exportable"""
+        from sklearn.ensemble import RandomForestClassifier
+        
+        if not isinstance(model, RandomForestClassifier) or not hasattr(model, 'estimators_'):
+            return None
+        if model.n_outputs_ != 1:
+            return None
+        
+        features, thresholds, children, missing, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            
+            features.append(np.where(is_leaf, -1, tree.feature))
+            thresholds.append(tree.threshold.astype(np.float64))
+            children.append(np.stack([tree.children_right, tree.children_left], axis=1).ravel() + offset)
+            missing.append(tree.missing_go_to_left.astype(bool) if hasattr(tree, 'missing_go_to_left')
+                           else np.zeros(tree.node_count, dtype=bool))
+            
+            # Mismas operaciones que DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :estimator.n_classes_].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+            
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        
+        return cls(
+            np.concatenate(features).astype(np.int32), np.concatenate(thresholds),
+            np.concatenate(children).astype(np.int32), np.concatenate(missing), np.concatenate(values),
+            np.array(roots, dtype=np.int32), max_depth, np.asarray(model.classes_)
+        )
+    
+    @property
+    def n_trees(self):
+        return len(self.roots)
+    
+    def predict_proba(self, X):
+        """Probabilidades por clase de cada fila; coincide con RandomForestClassifier.predict_proba"""
+        # El árbol de sklearn compara en float32 contra umbrales float64
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        values = X.ravel()
+        has_missing = bool(np.isnan(values).any())
+        
+        # Un recorrido por (fila, árbol); row_offsets ubica la fila dentro de X aplanada
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        active = np.arange(len(nodes))
+        current = nodes
+        
+        for _ in range(self.max_depth + 1):
+            feature = self.feature[current]
+            internal = feature >= 0
+            if not internal.all():
+                active, current, feature = active[internal], current[internal], feature[internal]
+                if not len(active):
+                    break
+            
+            sample = values[row_offsets[active] + feature]
+            go_left = sample <= self.threshold[current]
+            if has_missing:
+                go_left |= np.isnan(sample) & self.missing_left[current]
+            
+            current = self.children[2 * current + go_left]
+            nodes[active] = current
+        
+        # Se acumula árbol por árbol y luego se divide, en el mismo orden que sklearn
+        leaves = self.value[nodes.reshape(n_rows, self.n_trees)]
+        proba = np.zeros((n_rows, leaves.shape[2]))
+        for tree in range(self.n_trees):
+            proba += leaves[:, tree]
+        proba /= self.n_trees
+        return proba
+    
+    def to_dict(self):
+        """Arreglos para guardar junto al modelo (se pueden mapear con mmap)"""
+        return dict(self.__dict__)
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+class CatalogIndex:
+    """Catálogo de oportunidades activas listo para puntuarse en lote"""
+    
+    def __init__(self, opportunities, opportunity_features, opportunity_texts, signature=None,
+                 exploration_size=20, backend='full'):
+        self.signature = signature
+        self.opportunities = list(opportunities)
+        self.positions = {opportunity.id: position for position, opportunity in enumerate(self.opportunities)}
+        self.semantic = SemanticIndex(self.opportunities, opportunity_texts, backend=backend)
+        self.structured = StructuredIndex(self.opportunities, opportunity_features)
+        
+        self.skills = SkillIndex(exploration_size=exploration_size)
+        for opportunity in self.opportunities:
+            self.skills.add(opportunity.id, opportunity.get_required_skills())
+        self.skills.pop_window_changes()  # El catálogo no se actualiza incrementalmente
+        
+        self.ann = None
+    
+    def build_ann(self, n_tables=16, n_bits=14):
+        """Construye el índice aproximado sobre los vectores de texto del catálogo (backend 'full')"""
+        if self.semantic.matrix is not None and not isinstance(self.semantic.matrix, TfidfRows):
+            self.ann = LSHIndex(self.semantic.matrix, n_tables=n_tables, n_bits=n_bits)
+        return self.ann
+    
+    def __len__(self):
+        return len(self.opportunities)
+    
+    def subset(self, positions):
+        """Vista del catálogo restringida a las posiciones dadas"""
+        subset = copy.copy(self)
+        subset.opportunities = [self.opportunities[position] for position in positions]
+        subset.positions = {opportunity.id: position for position, opportunity in enumerate(subset.opportunities)}
+        subset.semantic = self.semantic.subset(positions)
+        subset.structured = self.structured.subset(positions)
+        return subset
+    
+    def candidates_for(self, student_skills=None, student_text=None):
+        """Catálogo podado a las oportunidades candidatas del estudiante
+        
+        Los candidatos son la unión de las fuentes activas: si se dan student_skills, las
+        oportunidades con habilidades en común (más el conjunto de exploración) y, si se da
+        student_text, la lista corta del índice aproximado.
+        """
+        positions = set()
+        use_skills = student_skills is not None
+        
+        if use_skills:
+            candidate_ids = self.skills.candidates(student_skills)
+            positions.update(self.positions[opp_id] for opp_id in candidate_ids if opp_id in self.positions)
+        
+        if student_text is not None and self.ann is not None:
+            student_vector = self.semantic.vectorizer.transform([student_text])
+            if student_vector.nnz == 0:
+                # Sin texto útil la búsqueda aproximada no discrimina
+                if not use_skills:
+                    return self
+            else:
+                positions.update(self.ann.query(student_vector).tolist())
+        
+        return self.subset(sorted(positions))
+
+# Columnas de estudiante y oportunidad que usan las características del modelo
+STUDENT_FEATURE_COLUMNS = [
+    'id', 'first_name', 'last_name', 'career', 'semester', 'credits_percentage', 'gpa',
+    'skills_technical', 'skills_soft', 'interests', 'languages', 'experience', 'is_available', 'updated_at'
+]
+OPPORTUNITY_FEATURE_COLUMNS = [
+    'id', 'type', 'description', 'required_skills', 'required_semester', 'required_careers',
+    'required_credits', 'duration_months', 'hours_per_week', 'salary', 'benefits'
+]
+
+# Candidatos de hiperparámetros evaluados por validación cruzada al entrenar
+PARAM_GRID = [
+    {'n_estimators': 100, 'max_depth': None, 'min_samples_leaf': 1},
+    {'n_estimators': 200, 'max_depth': None, 'min_samples_leaf': 1},
+    {'n_estimators': 100, 'max_depth': 12, 'min_samples_leaf': 1},
+    {'n_estimators': 100, 'max_depth': None, 'min_samples_leaf': 3}
+]
+
+def _peak_memory_mb():
+    """Memoria pico (MB) del proceso y de sus procesos hijos"""
+    if resource is None:
+        return None
+    
+    # ru_maxrss está en KB en Linux
+    return {
+        'process': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'workers': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)
+    }
+
+# Artefactos ajustados de una versión del modelo; se reemplazan juntos y nunca se modifican
+ModelSnapshot = namedtuple('ModelSnapshot', ['model', 'scaler', 'vectorizer', 'flat_forest', 'version', 'estimator_path'],
+                           defaults=(None,))
+
+# Categorías del análisis de postulantes (score de 0 a 10), ver AI_ANALYSIS_FEATURE.md
+APPLICANT_CATEGORIES = [
+    (9.0, 'highly_recommended', 'Altamente Recomendado'),
+    (8.0, 'recommended', 'Recomendado'),
+    (7.0, 'consider', 'Considerar'),
+    (float('-inf'), 'not_recommended', 'No Recomendado')
+]
 
 class AIMatchingEngine:
     """Motor de matching inteligente usando técnicas de Machine Learning"""
     
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.scaler = StandardScaler()
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+    # Pesos del score final de compatibilidad
+    SCORE_WEIGHTS = {
+        'semantic': 0.4,
+        'structured': 0.4,
+        'basic': 0.2
+    }
+    
+    def __init__(self, backend=None):
+        # 'full' (sklearn) o 'lite' (solo NumPy); el modelo, el escalador y el vectorizador
+        # se crean al entrenar o al cargar un modelo guardado
+        self.backend = backend or os.getenv('AI_MATCHING_BACKEND', 'full')
+        self._snapshot = ModelSnapshot(None, None, None, None, None)
         self.is_trained = False
-        self.model_path = './models/ai_matching_model.pkl'
+        self.model_path = './models/ai_matching_model.pkl'  # Solo lectura: modelos anteriores al registro
+        self.checkpoint_path = './models/ai_matching_incremental.pkl'
+        self.mmap_mode = 'r'  # Los arreglos del modelo se comparten entre procesos vía page cache
+        self._pending_model = None  # (ruta, versión) pendiente de carga diferida
+        self._model_lock = threading.RLock()
+        self.registry = ModelRegistry('./models/registry')
+        self.use_flat_forest = True
+        self.flat_forest_max_rows = 256  # Con lotes grandes el recorrido en Cython de sklearn es más rápido
+        self.registry_poll_interval = 2.0
+        self._last_registry_check = 0.0
+        self._update_lock = threading.Lock()
+        self._catalog_lock = threading.Lock()
+        self.catalog_index = None
+        self.feature_cache = FeatureCache(maxsize=2048)
+        self.score_cache = ScoreCache(max_bytes=int(float(os.getenv('SCORE_CACHE_MAX_MB', 32)) * 1024 * 1024))
+        self.skill_pruning = True
+        self.exploration_size = 20
+        self.ann_enabled = False
+        self.ann_min_catalog = 50000  # Por debajo el escaneo exacto es más rápido (ver LSHIndex)
+        self.ann_tables = 16
+        self.ann_bits = 14
         
+    # Los artefactos del modelo se leen de la instantánea activa; asignarlos crea una nueva
+    @property
+    def model(self):
+        return self._snapshot.model
+    
+    @model.setter
+    def model(self, value):
+        self._snapshot = self._snapshot._replace(model=value)
+    
+    @property
+    def scaler(self):
+        return self._snapshot.scaler
+    
+    @scaler.setter
+    def scaler(self, value):
+        self._snapshot = self._snapshot._replace(scaler=value)
+    
+    @property
+    def vectorizer(self):
+        return self._snapshot.vectorizer
+    
+    @vectorizer.setter
+    def vectorizer(self, value):
+        self._snapshot = self._snapshot._replace(vectorizer=value)
+    
+    @property
+    def flat_forest(self):
+        return self._snapshot.flat_forest
+    
+    @flat_forest.setter
+    def flat_forest(self, value):
+        self._snapshot = self._snapshot._replace(flat_forest=value)
+    
+    @property
+    def model_version(self):
+        return self._snapshot.version
+    
+    @model_version.setter
+    def model_version(self, value):
+        self._snapshot = self._snapshot._replace(version=value)
+    
     def prepare_student_features(self, student):
         """Prepara características del estudiante para el modelo"""
+        profile = self.student_profile(student)
+        return dict(profile.features), profile.text
+    
+    def student_profile(self, student):
+        """Perfil decodificado del estudiante, compartido entre llamadas mediante la caché LRU"""
+        student_id = getattr(student, 'id', None)
+        key = None if student_id is None else (student_id, getattr(student, 'updated_at', None))
+        return self.feature_cache.get_or_build(key, lambda: self._build_student_profile(student))
+    
+    def _build_student_profile(self, student):
+        """Decodifica una sola vez las listas JSON del estudiante y calcula su lado del score"""
+        skills_technical = student.get_skills_technical()
+        skills_soft = student.get_skills_soft()
+        interests = student.get_interests()
+        languages = student.get_languages()
+        experience = student.get_experience()
+        
+        # Calcula qué tan completo está el perfil del estudiante
+        completed_fields = sum([
+            bool(student.first_name and student.last_name),
+            bool(student.career),
+            bool(student.semester),
+            student.credits_percentage > 0,
+            bool(skills_technical),
+            bool(skills_soft),
+            bool(languages),
+            bool(experience)
+        ])
+        completeness = completed_fields / 8
+        
         features = {
             'semester': student.semester,
             'credits_percentage': student.credits_percentage,
             'gpa': student.gpa,
             'career_encoded': self._encode_career(student.career),
-            'skills_count': len(student.get_skills_technical()) + len(student.get_skills_soft()),
-            'languages_count': len(student.get_languages()),
-            'experience_count': len(student.get_experience()),
-            'profile_completeness': self._calculate_profile_completeness(student)
+            'skills_count': len(skills_technical) + len(skills_soft),
+            'languages_count': len(languages),
+            'experience_count': len(experience),
+            'profile_completeness': completeness
         }
         
         # Combinar habilidades e intereses para análisis de texto
-        text_features = ' '.join(
-            student.get_skills_technical() + 
-            student.get_skills_soft() + 
-            student.get_interests()
-        )
+        text_features = ' '.join(skills_technical + skills_soft + interests)
         
-        return features, text_features
+        # Multiplicadores de ajuste que dependen únicamente del estudiante
+        factors = []
+        if not student.is_available:
+            factors.append(0.5)  # Factor de disponibilidad
+        factors.append(0.5 + completeness * 0.5)  # Factor de perfil completo
+        if experience:
+            factors.append(1.1)  # Factor de experiencia previa
+        if len(languages) > 1:
+            factors.append(1.05)  # Factor de idiomas
+        
+        return StudentProfile(
+            skills_technical, skills_soft, interests, languages, experience,
+            features, text_features, completeness, factors
+        )
     
     def prepare_opportunity_features(self, opportunity):
         """Prepara características de la oportunidad para el modelo"""
@@ -73,7 +786,13 @@ class AIMatchingEngine:
             
             # Vectorizar textos
             texts = [student_text, opportunity_text]
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
+            if self.backend == 'lite':
+                return cosine(LiteTfidfVectorizer(max_features=1000).fit_transform(texts))
+            
+            from sklearn.metrics.pairwise import cosine_similarity
+            
+            # Vectorizador propio de la llamada: el del modelo compartido nunca se reajusta
+            tfidf_matrix = make_vectorizer(self.backend).fit_transform(texts)
             
             # Calcular similitud coseno
             similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
@@ -83,6 +802,41 @@ class AIMatchingEngine:
             print(f"Error calculando similitud semántica: {e}")
             return 0.0
     
+    def build_catalog_index(self, opportunities):
+        """Ajusta el vocabulario TF-IDF y arma las matrices del catálogo una sola vez"""
+        opportunity_features = []
+        opportunity_texts = []
+        for opportunity in opportunities:
+            features, text = self.prepare_opportunity_features(opportunity)
+            opportunity_features.append(features)
+            opportunity_texts.append(text)
+        
+        index = CatalogIndex(
+            opportunities, opportunity_features, opportunity_texts,
+            signature=self._catalog_signature(opportunities), exploration_size=self.exploration_size,
+            backend=self.backend
+        )
+        if self.ann_enabled and self.backend == 'full' and len(opportunities) >= self.ann_min_catalog:
+            index.build_ann(n_tables=self.ann_tables, n_bits=self.ann_bits)
+        
+        # Se publica ya completo: otros hilos ven el índice anterior o el nuevo, nunca uno a medias
+        self.catalog_index = index
+        return index
+    
+    def get_catalog_index(self, opportunities):
+        """Obtiene el índice del catálogo, reconstruyéndolo solo si el catálogo cambió"""
+        signature = self._catalog_signature(opportunities)
+        index = self.catalog_index
+        if index is not None and index.signature == signature:
+            return index
+        
+        with self._catalog_lock:
+            # Otro hilo pudo reconstruirlo mientras se esperaba el candado
+            index = self.catalog_index
+            if index is None or index.signature != signature:
+                index = self.build_catalog_index(opportunities)
+            return index
+    
     def calculate_structured_similarity(self, student_features, opportunity_features):
         """Calcula similitud basada en características estructuradas"""
         try:
@@ -102,76 +856,290 @@ class AIMatchingEngine:
             return 0.0
     
     def calculate_compatibility_score(self, student, opportunity):
-        """Calcula score de compatibilidad usando múltiples algoritmos"""
+        """Calcula score de compatibilidad usando múltiples algoritmos
+        
+        El score solo depende de las dos filas y del modelo, así que se guarda en score_cache
+        (los errores no se cachean).
+        """
         try:
-            # Preparar características
-            student_features, student_text = self.prepare_student_features(student)
-            opportunity_features, opportunity_text = self.prepare_opportunity_features(opportunity)
-            
-            # Calcular similitudes
-            semantic_sim = self.calculate_semantic_similarity(student_text, opportunity_text)
-            structured_sim = self.calculate_structured_similarity(student_features, opportunity_features)
-            
-            # Verificar requisitos básicos
-            basic_compatibility = self._check_basic_requirements(student, opportunity)
-            
-            # Calcular score final con pesos
-            weights = {
-                'semantic': 0.4,
-                'structured': 0.4,
-                'basic': 0.2
-            }
-            
-            final_score = (
-                semantic_sim * weights['semantic'] +
-                structured_sim * weights['structured'] +
-                basic_compatibility * weights['basic']
+            key = ScoreCache.key_for(student, opportunity, self.model_version)
+            return self.score_cache.get_or_compute(
+                key, lambda: self._compute_compatibility_score(student, opportunity)
             )
             
-            # Ajustar score basado en factores adicionales
-            final_score = self._apply_additional_factors(final_score, student, opportunity)
-            
-            return round(min(1.0, max(0.0, final_score)), 3)
-            
         except Exception as e:
             print(f"Error calculando score de compatibilidad: {e}")
             return 0.0
     
+    def _compute_compatibility_score(self, student, opportunity):
+        # Preparar características
+        student_features, student_text = self.prepare_student_features(student)
+        opportunity_features, opportunity_text = self.prepare_opportunity_features(opportunity)
+        
+        # Calcular similitud semántica
+        semantic_sim = self.calculate_semantic_similarity(student_text, opportunity_text)
+        
+        return self._combine_scores(
+            semantic_sim, student, student_features, opportunity, opportunity_features
+        )
+    
+    def calculate_compatibility_scores(self, student, index):
+        """Calcula el score de compatibilidad contra todo el catálogo como operaciones de arreglos"""
+        return self.calculate_compatibility_matrix([student], index)[0]
+    
+    def calculate_compatibility_matrix(self, students, index):
+        """Calcula la matriz de scores estudiantes x oportunidades del catálogo"""
+        profiles = [self.student_profile(student) for student in students]
+        student_texts = [profile.text for profile in profiles]
+        
+        semantic_sim = index.semantic.similarities(student_texts)
+        return self._score_matrix(students, profiles, semantic_sim, index.structured)
+    
+    def _score_matrix(self, students, profiles, semantic_sim, structured):
+        """Combina la similitud semántica ya calculada con la estructurada, los requisitos y los factores"""
+        student_factors = [profile.factors for profile in profiles]
+        student_vectors = np.array(
+            [profile.vector for profile in profiles], dtype=np.float32
+        ).reshape(len(students), -1)
+        
+        structured_sim = structured.similarities(student_vectors)
+        basic_compatibility = structured.basic_requirements(
+            np.array([student.semester for student in students], dtype=np.float64),
+            np.array([student.credits_percentage for student in students], dtype=np.float64),
+            [student.career for student in students]
+        )
+        
+        final_scores = (
+            semantic_sim * self.SCORE_WEIGHTS['semantic'] +
+            structured_sim * self.SCORE_WEIGHTS['structured'] +
+            basic_compatibility * self.SCORE_WEIGHTS['basic']
+        )
+        
+        # Los factores adicionales solo dependen del estudiante; se completan con 1.0 (multiplicación exacta)
+        n_factors = max((len(factors) for factors in student_factors), default=0)
+        factor_matrix = np.ones((len(students), n_factors))
+        for row, factors in enumerate(student_factors):
+            factor_matrix[row, :len(factors)] = factors
+        for column in range(n_factors):
+            final_scores = final_scores * factor_matrix[:, column:column + 1]
+        final_scores = np.minimum(1.0, final_scores)
+        
+        return self._round_scores(np.clip(final_scores, 0.0, 1.0))
+    
     def get_top_recommendations(self, student, opportunities, top_n=10):
         """Obtiene las mejores recomendaciones para un estudiante"""
         try:
-            recommendations = []
+            active_opportunities = [opportunity for opportunity in opportunities if opportunity.is_active]
+            index = self.get_catalog_index(active_opportunities)
+            if self.skill_pruning or index.ann is not None:
+                # Solo se puntúan (de forma exacta) los candidatos de habilidades y/o del índice aproximado
+                profile = self.student_profile(student)
+                index = index.candidates_for(
+                    student_skills=profile.skills_technical + profile.skills_soft if self.skill_pruning else None,
+                    student_text=profile.text if index.ann is not None else None
+                )
+            scores = self.calculate_compatibility_scores(student, index)
             
-            for opportunity in opportunities:
-                if not opportunity.is_active:
-                    continue
-                
-                score = self.calculate_compatibility_score(student, opportunity)
-                
-                if score >= 0.3:  # Solo incluir recomendaciones con score >= 30%
-                    recommendations.append({
-                        'opportunity': opportunity,
-                        'score': score,
-                        'company': opportunity.company
-                    })
-            
-            # Ordenar por score descendente
-            recommendations.sort(key=lambda x: x['score'], reverse=True)
+            # Solo incluir recomendaciones con score >= 30%, ordenadas por score descendente
+            candidates = np.flatnonzero(scores >= 0.3)
+            ranked = candidates[np.argsort(-scores[candidates], kind='stable')][:top_n]
             
-            return recommendations[:top_n]
+            # El índice en caché puede venir de una llamada anterior: se devuelven los objetos del
+            # llamador (por id), no los guardados en el índice, que pueden estar desactualizados
+            by_id = {opportunity.id: opportunity for opportunity in active_opportunities}
+            results = []
+            for position in ranked:
+                opportunity = by_id[index.opportunities[position].id]
+                results.append({
+                    'opportunity': opportunity,
+                    'score': float(scores[position]),
+                    'company': opportunity.company
+                })
+            return results
             
         except Exception as e:
             print(f"Error obteniendo recomendaciones: {e}")
             return []
     
-    def train_model(self, applications_data):
-        """Entrena el modelo de ML con datos históricos"""
+    def rank_applicants(self, opportunity, students):
+        """Puntúa, categoriza y ordena a todos los postulantes de una oportunidad en una sola pasada
+        
+        La oportunidad se vectoriza una vez contra el vocabulario TF-IDF de los postulantes, los
+        scores se calculan como una columna de la matriz de compatibilidad y las fortalezas y
+        brechas salen de una matriz booleana postulante x habilidad requerida.
+        """
+        try:
+            students = list(students)
+            opportunity_features, opportunity_text = self.prepare_opportunity_features(opportunity)
+            profiles = [self.student_profile(student) for student in students]
+            
+            if students:
+                semantic = SemanticIndex(students, [profile.text for profile in profiles], backend=self.backend)
+                semantic_sim = semantic.similarities([opportunity_text])[0] if opportunity_text.strip() \
+                    else np.zeros(len(students))
+                structured = StructuredIndex([opportunity], [opportunity_features])
+                scores = self._score_matrix(students, profiles, semantic_sim[:, None], structured)[:, 0]
+            else:
+                scores = np.zeros(0)
+            
+            # Habilidades requeridas que tiene cada postulante (comparación sin acentos ni mayúsculas)
+            required_columns = {}
+            required_names = []
+            for skill in opportunity.get_required_skills():
+                if canonical_skill(skill) not in required_columns:
+                    required_columns[canonical_skill(skill)] = len(required_names)
+                    required_names.append(skill)
+            
+            rows, columns = [], []
+            for row, profile in enumerate(profiles):
+                for skill in profile.skills_technical + profile.skills_soft:
+                    column = required_columns.get(canonical_skill(skill))
+                    if column is not None:
+                        rows.append(row)
+                        columns.append(column)
+            has_skill = np.zeros((len(students), len(required_columns)), dtype=bool)
+            has_skill[rows, columns] = True
+            
+            scores_10 = np.round(scores * 10, 1)
+            probabilities = self.predict_success_for_applicants(opportunity, students)
+            ranked = np.argsort(-scores, kind='stable')
+            
+            rankings = []
+            summary = {key: 0 for _, key, _ in APPLICANT_CATEGORIES}
+            for rank, position in enumerate(ranked, start=1):
+                key, label = next(
+                    (key, label) for threshold, key, label in APPLICANT_CATEGORIES if scores_10[position] >= threshold
+                )
+                summary[key] += 1
+                rankings.append({
+                    'rank': rank,
+                    'student': students[position],
+                    'score': float(scores_10[position]),
+                    'match_score': float(scores[position]),
+                    'category': key,
+                    'recommendation': label,
+                    'strengths': [required_names[column] for column in np.flatnonzero(has_skill[position])],
+                    'gaps': [required_names[column] for column in np.flatnonzero(~has_skill[position])],
+                    'success_probability': float(probabilities[position])
+                })
+            
+            return {
+                'opportunity': opportunity,
+                'total_applications': len(students),
+                'summary': summary,
+                'estimated_success_rate': round(float(np.mean(probabilities)), 3) if len(students) else 0.0,
+                'rankings': rankings
+            }
+            
+        except Exception as e:
+            print(f"Error analizando postulantes: {e}")
+            return {
+                'opportunity': opportunity,
+                'total_applications': 0,
+                'summary': {key: 0 for _, key, _ in APPLICANT_CATEGORIES},
+                'estimated_success_rate': 0.0,
+                'rankings': []
+            }
+    
+    def score_all_students(self, students, opportunities, db_path, top_n=20, block_size=500,
+                           table='engine_recommendations', min_score=0.3):
+        """Precalcula las mejores recomendaciones de todos los estudiantes por bloques acotados en memoria
+        
+        Cada bloque produce una matriz de block_size x oportunidades; solo se conservan las top_n de cada
+        estudiante y se escriben en la tabla indicada antes de pasar al siguiente bloque. La tabla
+        recommendations es de RecommendationRefresher (score básico, otra escala): no se mezclan.
+        """
+        active_opportunities = [opportunity for opportunity in opportunities if opportunity.is_active]
+        index = self.get_catalog_index(active_opportunities)
+        opportunity_ids = np.array([opportunity.id for opportunity in index.opportunities])
+        keep = min(top_n, len(index))
+        
+        stats = {
+            'students': 0,
+            'pairs_scored': 0,
+            'rows_written': 0,
+            'elapsed_seconds': 0.0,
+            'pairs_per_second': 0.0,
+            'rows_per_second': 0.0
+        }
+        started = time.perf_counter()
+        
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    student_id INTEGER NOT NULL,
+                    opportunity_id INTEGER NOT NULL,
+                    score REAL NOT NULL,
+                    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (student_id, opportunity_id)
+                )
+            ''')
+            
+            students = iter(students)
+            while True:
+                block = list(islice(students, block_size))
+                if not block:
+                    break
+                
+                student_ids = [student.id for student in block]
+                rows = []
+                if keep > 0:
+                    scores = self.calculate_compatibility_matrix(block, index)
+                    
+                    # Top-N por estudiante sin ordenar toda la fila; los empates se resuelven por posición
+                    thresholds = np.partition(scores, -keep, axis=1)[:, -keep]
+                    
+                    for row, student_id in enumerate(student_ids):
+                        threshold = max(thresholds[row], min_score)
+                        candidates = np.flatnonzero(scores[row] >= threshold)
+                        ranked = candidates[np.argsort(-scores[row, candidates], kind='stable')][:keep]
+                        rows.extend(
+                            (student_id, int(opportunity_ids[position]), float(scores[row, position]))
+                            for position in ranked
+                        )
+                
+                conn.executemany(f'DELETE FROM {table} WHERE student_id = ?', [(sid,) for sid in student_ids])
+                conn.executemany(
+                    f'INSERT INTO {table} (student_id, opportunity_id, score) VALUES (?, ?, ?)', rows
+                )
+                conn.commit()
+                
+                stats['students'] += len(block)
+                stats['pairs_scored'] += len(block) * len(index)
+                stats['rows_written'] += len(rows)
+                elapsed = time.perf_counter() - started
+                print(f"Bloque procesado: {stats['students']} estudiantes, "
+                      f"{stats['pairs_scored'] / elapsed:,.0f} pares/s, {stats['rows_written'] / elapsed:,.0f} filas/s")
+        
+        stats['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        if stats['elapsed_seconds'] > 0:
+            stats['pairs_per_second'] = round(stats['pairs_scored'] / stats['elapsed_seconds'], 1)
+            stats['rows_per_second'] = round(stats['rows_written'] / stats['elapsed_seconds'], 1)
+        
+        return stats
+    
+    def train_model(self, applications_data, param_grid=None, cv_folds=5, n_jobs=None):
+        """Entrena el modelo de ML con datos históricos
+        
+        Los folds de validación cruzada de cada candidato de param_grid se evalúan en un
+        pool de procesos, el modelo final construye sus árboles en paralelo y al terminar se
+        escribe un reporte JSON (tiempos por etapa, memoria pico, scores) junto a model_path.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        
         try:
             if not applications_data:
                 print("No hay datos suficientes para entrenar el modelo")
                 return False
             
+            n_jobs = n_jobs or os.cpu_count() or 1
+            param_grid = param_grid or PARAM_GRID
+            stages = {}
+            
             # Preparar datos de entrenamiento
+            started = time.perf_counter()
             X = []
             y = []
             
@@ -193,23 +1161,64 @@ class AIMatchingEngine:
             X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=0.2, random_state=42
             )
+            stages['prepare_features'] = time.perf_counter() - started
+            
+            # Validación cruzada de los candidatos en paralelo
+            started = time.perf_counter()
+            cv_results = self._cross_validate(X_train, y_train, param_grid, cv_folds, n_jobs)
+            if cv_results:
+                best = max(cv_results, key=lambda result: result['mean_score'])
+                params = best['params']
+            else:
+                params = {'n_estimators': 100}
+            stages['cross_validation'] = time.perf_counter() - started
             
             # Normalizar características
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            started = time.perf_counter()
+            # Modelo y escalador nuevos: el activo sigue atendiendo solicitudes mientras se entrena
+            scaler = StandardScaler()
+            X_train_scaled = scaler.fit_transform(X_train)
+            X_test_scaled = scaler.transform(X_test)
             
-            # Entrenar modelo
-            self.model.fit(X_train_scaled, y_train)
+            # Entrenar modelo con los árboles en paralelo
+            model = RandomForestClassifier(random_state=42, n_jobs=n_jobs, **params)
+            model.fit(X_train_scaled, y_train)
+            stages['fit'] = time.perf_counter() - started
             
             # Evaluar modelo
-            train_score = self.model.score(X_train_scaled, y_train)
-            test_score = self.model.score(X_test_scaled, y_test)
+            started = time.perf_counter()
+            train_score = model.score(X_train_scaled, y_train)
+            test_score = model.score(X_test_scaled, y_test)
+            
+            # Las predicciones son de pocas filas por solicitud; el pool de hilos no compensa
+            model.set_params(n_jobs=1)
+            stages['evaluate'] = time.perf_counter() - started
             
             print(f"Modelo entrenado - Train Score: {train_score:.3f}, Test Score: {test_score:.3f}")
             
             # Guardar modelo
-            self._save_model()
-            self.is_trained = True
+            started = time.perf_counter()
+            self._swap_artifacts(model, scaler, self.vectorizer)
+            self._save_model({
+                'train_score': round(float(train_score), 4),
+                'test_score': round(float(test_score), 4),
+                'cv_score': max((result['mean_score'] for result in cv_results), default=None),
+                'samples': int(len(y))
+            })
+            stages['save'] = time.perf_counter() - started
+            
+            self._write_training_report({
+                'trained_at': datetime.utcnow().isoformat(),
+                'samples': int(len(y)),
+                'n_jobs': n_jobs,
+                'stages_seconds': {stage: round(seconds, 3) for stage, seconds in stages.items()},
+                'total_seconds': round(sum(stages.values()), 3),
+                'peak_memory_mb': _peak_memory_mb(),
+                'cross_validation': cv_results,
+                'best_params': params,
+                'train_score': round(float(train_score), 4),
+                'test_score': round(float(test_score), 4)
+            })
             
             return True
             
@@ -217,31 +1226,210 @@ class AIMatchingEngine:
             print(f"Error entrenando modelo: {e}")
             return False
     
+    def _cross_validate(self, X, y, param_grid, cv_folds, n_jobs):
+        """Evalúa cada candidato de hiperparámetros con validación cruzada estratificada"""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from sklearn.model_selection import StratifiedKFold
+        
+        # Cada clase necesita al menos un ejemplo por fold
+        n_splits = min(cv_folds, int(np.bincount(y).min()) if len(np.unique(y)) > 1 else 0)
+        if n_splits < 2:
+            print("No hay datos suficientes para validación cruzada")
+            return []
+        
+        folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y))
+        tasks = [(params, train_index, test_index) for params in param_grid for train_index, test_index in folds]
+        
+        try:
+            # spawn y no fork: el proceso del servidor tiene otros hilos (checkpoints del WAL,
+            # escritor, Flask) y un fork con hilos corriendo puede heredar locks tomados. Los
+            # procesos se crean en los submit, con cv_worker como __main__ para que no
+            # re-ejecuten el script del padre (app.py crearía la aplicación en cada worker)
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks)),
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                with spawn_without_main():
+                    futures = [pool.submit(evaluate_fold, params, X, y, train_index, test_index)
+                               for params, train_index, test_index in tasks]
+                scores = [future.result() for future in futures]
+        except Exception as e:
+            print(f"Error en el pool de validación cruzada, evaluando en serie: {e}")
+            scores = [evaluate_fold(params, X, y, train_index, test_index)
+                      for params, train_index, test_index in tasks]
+        
+        results = []
+        for i, params in enumerate(param_grid):
+            fold_scores = [round(float(score), 4) for score in scores[i * n_splits:(i + 1) * n_splits]]
+            results.append({
+                'params': params,
+                'fold_scores': fold_scores,
+                'mean_score': round(float(np.mean(fold_scores)), 4)
+            })
+        
+        return results
+    
+    def _write_training_report(self, report):
+        """Escribe el reporte de entrenamiento en JSON junto al modelo"""
+        try:
+            report_path = os.path.splitext(self.model_path)[0] + '_training_report.json'
+            os.makedirs(os.path.dirname(report_path), exist_ok=True)
+            with open(report_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Reporte de entrenamiento guardado en {report_path}")
+            
+        except Exception as e:
+            print(f"Error guardando reporte de entrenamiento: {e}")
+    
+    def train_incremental(self, db_path, chunk_size=1000):
+        """Entrena de forma incremental leyendo por bloques las aplicaciones decididas desde SQLite
+        
+        Solo se leen las aplicaciones aceptadas o rechazadas después de la marca del último
+        checkpoint; el modelo (SGD con pérdida logística) y el escalador se actualizan con
+        partial_fit y se guardan juntos en checkpoint_path.
+        """
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.preprocessing import StandardScaler
+        
+        started = time.perf_counter()
+        checkpoint = self._load_checkpoint()
+        if checkpoint is None:
+            checkpoint = {
+                'model': SGDClassifier(loss='log_loss', random_state=42),
+                'scaler': StandardScaler(),
+                'watermark': ('', 0),
+                'samples_seen': 0
+            }
+        
+        model = checkpoint['model']
+        scaler = checkpoint['scaler']
+        decided_at, last_id = checkpoint['watermark']
+        stats = {'samples': 0, 'chunks': 0, 'samples_seen': checkpoint['samples_seen']}
+        
+        columns = ', '.join(
+            [f's.{column} AS s_{column}' for column in STUDENT_FEATURE_COLUMNS] +
+            [f'o.{column} AS o_{column}' for column in OPPORTUNITY_FEATURE_COLUMNS]
+        )
+        decided_expression = 'COALESCE(a.responded_at, a.reviewed_at, a.updated_at, a.applied_at)'
+        query = f'''
+            SELECT a.id AS application_id, a.status, {decided_expression} AS decided_at, {columns}
+            FROM applications a
+            JOIN students s ON s.id = a.student_id
+            JOIN opportunities o ON o.id = a.opportunity_id
+            WHERE a.status IN ('accepted', 'rejected')
+              AND ({decided_expression} > ? OR ({decided_expression} = ? AND a.id > ?))
+            ORDER BY decided_at, a.id
+        '''
+        
+        try:
+            with sqlite3.connect(db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.execute(query, (decided_at, decided_at, last_id))
+                
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    
+                    X = []
+                    y = []
+                    for row in rows:
+                        row = dict(row)
+                        student = RowRecord({column: row[f's_{column}'] for column in STUDENT_FEATURE_COLUMNS})
+                        opportunity = RowRecord({column: row[f'o_{column}'] for column in OPPORTUNITY_FEATURE_COLUMNS})
+                        
+                        student_features, _ = self.prepare_student_features(student)
+                        opportunity_features, _ = self.prepare_opportunity_features(opportunity)
+                        X.append(list(student_features.values()) + list(opportunity_features.values()))
+                        
+                        # Etiqueta: 1 si fue aceptada, 0 si no
+                        y.append(1 if row['status'] == 'accepted' else 0)
+                    
+                    X = np.array(X, dtype=np.float64)
+                    scaler.partial_fit(X)
+                    model.partial_fit(scaler.transform(X), np.array(y), classes=np.array([0, 1]))
+                    
+                    last_row = rows[-1]
+                    checkpoint['watermark'] = (last_row['decided_at'], last_row['application_id'])
+                    stats['samples'] += len(rows)
+                    stats['chunks'] += 1
+            
+        except Exception as e:
+            print(f"Error entrenando modelo incremental: {e}")
+            return None
+        
+        checkpoint['samples_seen'] += stats['samples']
+        stats['samples_seen'] = checkpoint['samples_seen']
+        stats['watermark'] = checkpoint['watermark']
+        stats['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        
+        if stats['samples'] == 0:
+            print("No hay aplicaciones nuevas desde el último checkpoint")
+            return stats
+        
+        self._save_checkpoint(checkpoint)
+        self._swap_artifacts(model, scaler, self.vectorizer)
+        self._save_model({'samples': stats['samples'], 'samples_seen': stats['samples_seen']})
+        
+        print(f"Modelo incremental actualizado con {stats['samples']} aplicaciones "
+              f"({stats['samples_seen']} en total) en {stats['elapsed_seconds']}s")
+        return stats
+    
     def predict_success_probability(self, student, opportunity):
         """Predice la probabilidad de éxito usando el modelo entrenado"""
+        return float(self.predict_success_probabilities([(student, opportunity)])[0])
+    
+    def predict_success_probabilities(self, pairs):
+        """Predice la probabilidad de éxito de muchos pares (estudiante, oportunidad) en una sola llamada"""
+        pairs = list(pairs)
+        opportunity_rows = {}
+        rows = []
+        for student, opportunity in pairs:
+            # Las características de cada oportunidad se calculan una sola vez
+            key = id(opportunity)
+            if key not in opportunity_rows:
+                opportunity_features, _ = self.prepare_opportunity_features(opportunity)
+                opportunity_rows[key] = list(opportunity_features.values())
+            rows.append(list(self.student_profile(student).features.values()) + opportunity_rows[key])
+        
+        return self._predict_rows(rows)
+    
+    def predict_success_for_applicants(self, opportunity, students):
+        """Predice la probabilidad de éxito de muchos estudiantes para una misma oportunidad"""
+        return self.predict_success_probabilities((student, opportunity) for student in students)
+    
+    def _predict_rows(self, rows):
+        """Normaliza y evalúa la matriz combinada de características con una sola llamada al modelo"""
+        probabilities = np.full(len(rows), 0.5)  # Valor por defecto si el modelo no está entrenado
+        self._ensure_model_loaded()
+        snapshot = self._snapshot
+        if not self.is_trained or (snapshot.model is None and snapshot.estimator_path is None) or not rows:
+            return probabilities
+        
         try:
-            if not self.is_trained:
-                return 0.5  # Valor por defecto si el modelo no está entrenado
-            
-            # Preparar características
-            student_features, _ = self.prepare_student_features(student)
-            opportunity_features, _ = self.prepare_opportunity_features(opportunity)
+            # Las filas con valores faltantes conservan el valor por defecto, igual que la ruta por pares
+            valid = [position for position, row in enumerate(rows) if None not in row]
+            if not valid:
+                return probabilities
             
-            # Combinar características
-            combined_features = {**student_features, **opportunity_features}
-            X = np.array(list(combined_features.values())).reshape(1, -1)
+            X = np.array([rows[position] for position in valid], dtype=np.float64)
             
-            # Normalizar
-            X_scaled = self.scaler.transform(X)
+            # Normalizar (modelo y escalador salen de la misma instantánea aunque haya un cambio en curso)
+            X_scaled = snapshot.scaler.transform(X)
             
-            # Predecir probabilidad
-            probability = self.model.predict_proba(X_scaled)[0][1]
+            # El recorrido sobre arreglos planos evita la validación de sklearn en cada llamada
+            flat_forest = snapshot.flat_forest
+            if flat_forest is not None and self.use_flat_forest and len(valid) <= self.flat_forest_max_rows:
+                proba = flat_forest.predict_proba(X_scaled)
+            else:
+                proba = self._estimator(snapshot).predict_proba(X_scaled)
             
-            return round(probability, 3)
+            # Predecir probabilidad (round() sobre np.float64 ya usaba el redondeo de NumPy)
+            probabilities[valid] = np.round(proba[:, 1], 3)
+            return probabilities
             
         except Exception as e:
             print(f"Error prediciendo probabilidad: {e}")
-            return 0.5
+            return np.full(len(rows), 0.5)
     
     def _encode_career(self, career):
         """Codifica carrera como número"""
@@ -270,27 +1458,44 @@ class AIMatchingEngine:
     
     def _calculate_profile_completeness(self, student):
         """Calcula qué tan completo está el perfil del estudiante"""
-        total_fields = 8
-        completed_fields = 0
-        
-        if student.first_name and student.last_name:
-            completed_fields += 1
-        if student.career:
-            completed_fields += 1
-        if student.semester:
-            completed_fields += 1
-        if student.credits_percentage > 0:
-            completed_fields += 1
-        if student.get_skills_technical():
-            completed_fields += 1
-        if student.get_skills_soft():
-            completed_fields += 1
-        if student.get_languages():
-            completed_fields += 1
-        if student.get_experience():
-            completed_fields += 1
-        
-        return completed_fields / total_fields
+        return self.student_profile(student).completeness
+    
+    def _combine_scores(self, semantic_sim, student, student_features, opportunity, opportunity_features):
+        """Combina la similitud semántica con la estructurada y los requisitos básicos"""
+        structured_sim = self.calculate_structured_similarity(student_features, opportunity_features)
+        
+        # Verificar requisitos básicos
+        basic_compatibility = self._check_basic_requirements(student, opportunity)
+        
+        # Calcular score final con pesos
+        final_score = (
+            semantic_sim * self.SCORE_WEIGHTS['semantic'] +
+            structured_sim * self.SCORE_WEIGHTS['structured'] +
+            basic_compatibility * self.SCORE_WEIGHTS['basic']
+        )
+        
+        # Ajustar score basado en factores adicionales
+        final_score = self._apply_additional_factors(final_score, student, opportunity)
+        
+        return round(min(1.0, max(0.0, float(final_score))), 3)
+    
+    def _round_scores(self, scores, decimals=3):
+        """Redondea igual que round() de Python, que no redondea los empates al par como NumPy"""
+        rounded = np.round(scores, decimals)
+        scaled = scores * 10 ** decimals
+        ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+        if len(ties):
+            # Los empates se repiten mucho; basta redondear cada valor distinto una vez
+            values, inverse = np.unique(scores.flat[ties], return_inverse=True)
+            fixed = np.array([round(float(value), decimals) for value in values])
+            rounded.flat[ties] = fixed[inverse]
+        return rounded
+    
+    def _catalog_signature(self, opportunities):
+        """Firma del catálogo: cambia si se agregan, quitan o editan oportunidades"""
+        return tuple(
+            (opportunity.id, getattr(opportunity, 'updated_at', None)) for opportunity in opportunities
+        )
     
     def _check_basic_requirements(self, student, opportunity):
         """Verifica si el estudiante cumple los requisitos básicos"""
@@ -321,52 +1526,84 @@ class AIMatchingEngine:
         """Aplica factores adicionales para ajustar el score"""
         adjusted_score = base_score
         
-        # Factor de disponibilidad
-        if not student.is_available:
-            adjusted_score *= 0.5
-        
-        # Factor de perfil completo
-        profile_completeness = self._calculate_profile_completeness(student)
-        adjusted_score *= (0.5 + profile_completeness * 0.5)
-        
-        # Factor de experiencia previa
-        if student.get_experience():
-            adjusted_score *= 1.1
-        
-        # Factor de idiomas
-        if len(student.get_languages()) > 1:
-            adjusted_score *= 1.05
+        for factor in self._additional_factors(student):
+            adjusted_score *= factor
         
         return min(1.0, adjusted_score)
     
-    def _save_model(self):
-        """Guarda el modelo entrenado"""
+    def _additional_factors(self, student):
+        """Multiplicadores de ajuste que dependen únicamente del estudiante"""
+        return self.student_profile(student).factors
+    
+    def _save_model(self, metrics=None):
+        """Publica el modelo entrenado como nueva versión del registro
+        
+        El artefacto se escribe una sola vez, en el directorio del registro; model_path ya no
+        se sobrescribe y solo se lee si el registro está vacío.
+        """
         try:
-            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            
+            snapshot = self._snapshot
+            # El estimador de sklearn va en su propio archivo (ver _load_artifacts)
             model_data = {
-                'model': self.model,
-                'scaler': self.scaler,
-                'vectorizer': self.vectorizer,
+                'scaler': snapshot.scaler,
+                'vectorizer': snapshot.vectorizer,
+                'flat_forest': snapshot.flat_forest.to_dict() if snapshot.flat_forest else None,
                 'trained_at': datetime.utcnow().isoformat()
             }
             
-            joblib.dump(model_data, self.model_path)
-            print(f"Modelo guardado en {self.model_path}")
+            self.model_version = self.registry.publish(model_data, metrics, estimator=snapshot.model)
+            self._pending_model = None
+            print(f"Modelo guardado en {self.registry.path_for(self.model_version)} (versión {self.model_version})")
             
         except Exception as e:
             print(f"Error guardando modelo: {e}")
     
-    def load_model(self):
-        """Carga el modelo entrenado"""
+    def _save_checkpoint(self, checkpoint):
+        """Guarda el checkpoint del entrenamiento incremental (modelo, escalador y marca)"""
+        import joblib
+        
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+            checkpoint['trained_at'] = datetime.utcnow().isoformat()
+            joblib.dump(checkpoint, self.checkpoint_path)
+            
+        except Exception as e:
+            print(f"Error guardando checkpoint: {e}")
+    
+    def _load_checkpoint(self):
+        """Carga el checkpoint del entrenamiento incremental, si existe"""
+        import joblib
+        
+        try:
+            if os.path.exists(self.checkpoint_path):
+                return joblib.load(self.checkpoint_path)
+            return None
+            
+        except Exception as e:
+            print(f"Error cargando checkpoint: {e}")
+            return None
+    
+    def load_model(self, lazy=True):
+        """Carga el modelo entrenado
+        
+        Usa la versión activa del registro y, si está vacío, model_path. Con lazy=True solo se
+        registra la ruta y la carga se hace en la primera predicción; los arreglos se abren de
+        solo lectura con mmap para que los workers compartan páginas. El estimador de sklearn
+        se carga recién cuando un lote lo necesita (ver _estimator).
+        """
         try:
-            if os.path.exists(self.model_path):
-                model_data = joblib.load(self.model_path)
-                self.model = model_data['model']
-                self.scaler = model_data['scaler']
-                self.vectorizer = model_data['vectorizer']
-                self.is_trained = True
-                print(f"Modelo cargado desde {self.model_path}")
+            version = self.registry.current_version()
+            path = self.registry.path_for(version) if version else self.model_path
+            
+            if os.path.exists(path):
+                if lazy:
+                    self._pending_model = (path, version)
+                    self.is_trained = True
+                    print(f"Modelo registrado en {path} (carga diferida)")
+                    return True
+                
+                self._load_artifacts(path, version)
+                print(f"Modelo cargado desde {path}")
                 return True
             else:
                 print("No se encontró modelo previamente entrenado")
@@ -376,12 +1613,140 @@ class AIMatchingEngine:
             print(f"Error cargando modelo: {e}")
             return False
     
+    def _load_artifacts(self, path, version=None):
+        """Abre los artefactos del modelo mapeando sus arreglos en memoria y los activa
+        
+        El bosque plano son arreglos NumPy simples y queda mapeado con mmap, compartido entre
+        workers. El estimador de sklearn no se puede compartir así (Tree.__setstate__ copia los
+        nodos a memoria del proceso), por eso se guarda aparte y solo se carga aquí si no hay
+        bosque plano; los modelos anteriores al registro lo traen dentro del artefacto.
+        """
+        import joblib
+        
+        model_data = joblib.load(path, mmap_mode=self.mmap_mode)
+        flat_forest = model_data.get('flat_forest')
+        model = model_data.get('model')
+        estimator_path = self.registry.estimator_path_for(version) if version else None
+        if model is None and not flat_forest and estimator_path:
+            model = joblib.load(estimator_path)
+        
+        self._swap_artifacts(
+            model, model_data['scaler'], model_data['vectorizer'], version,
+            FlatForest.from_dict(flat_forest) if flat_forest else None, estimator_path
+        )
+    
+    def _swap_artifacts(self, model, scaler, vectorizer, version=None, flat_forest=None, estimator_path=None):
+        """Activa un modelo; las predicciones en curso terminan con las referencias anteriores"""
+        if flat_forest is None and model is not None:
+            flat_forest = FlatForest.from_model(model)
+        
+        # Una sola asignación de referencia: cada lectura ve la instantánea anterior o la nueva
+        with self._model_lock:
+            previous = self._snapshot
+            self._snapshot = ModelSnapshot(model, scaler, vectorizer, flat_forest, version, estimator_path)
+            self.is_trained = True
+            self._pending_model = None
+        
+        # Las claves llevan la versión, así que basta con liberar la memoria de las anteriores
+        if model is not previous.model or version != previous.version:
+            self.score_cache.clear()
+    
+    def _estimator(self, snapshot):
+        """Estimador de sklearn de la instantánea, cargado la primera vez que un lote lo necesita"""
+        if snapshot.model is not None or snapshot.estimator_path is None:
+            return snapshot.model
+        
+        import joblib
+        
+        with self._model_lock:
+            current = self._snapshot
+            if current.version == snapshot.version and current.model is not None:
+                return current.model
+            
+            model = joblib.load(snapshot.estimator_path)
+            if current.version == snapshot.version:
+                self._snapshot = current._replace(model=model)
+            return model
+    
+    def _ensure_model_loaded(self):
+        """Completa la carga diferida del modelo antes del primer uso"""
+        if self._pending_model is None:
+            return
+        
+        with self._model_lock:
+            if self._pending_model is None:
+                return
+            
+            path, version = self._pending_model
+            try:
+                self._load_artifacts(path, version)
+                print(f"Modelo cargado desde {path}")
+                
+            except Exception as e:
+                print(f"Error cargando modelo: {e}")
+                self._pending_model = None
+                self.is_trained = False
+    
+    def check_for_model_update(self):
+        """Cambia a la versión activa del registro si otra instancia publicó una nueva
+        
+        Pensado para llamarse entre solicitudes; consulta el manifiesto como máximo una vez
+        cada registry_poll_interval segundos.
+        """
+        now = time.monotonic()
+        if now - self._last_registry_check < self.registry_poll_interval:
+            return False
+        
+        # Si otro hilo ya está revisando o cargando, esta solicitud sigue con el modelo actual
+        if not self._update_lock.acquire(blocking=False):
+            return False
+        self._last_registry_check = now
+        
+        try:
+            version = self.registry.current_version()
+            pending_version = self._pending_model[1] if self._pending_model else None
+            if version is None or version in (self.model_version, pending_version):
+                return False
+            
+            # Se carga fuera del candado; el cambio de referencias es instantáneo
+            self._load_artifacts(self.registry.path_for(version), version)
+            print(f"Modelo actualizado a la versión {version}")
+            return True
+            
+        except Exception as e:
+            print(f"Error actualizando modelo: {e}")
+            return False
+        
+        finally:
+            self._update_lock.release()
+    
+    def rollback_model(self):
+        """Vuelve a la versión anterior del registro y la activa"""
+        try:
+            version = self.registry.rollback()
+            if version is None:
+                print("No hay una versión anterior del modelo")
+                return None
+            
+            self._load_artifacts(self.registry.path_for(version), version)
+            print(f"Modelo revertido a la versión {version}")
+            return version
+            
+        except Exception as e:
+            print(f"Error revirtiendo modelo: {e}")
+            return None
+    
     def get_model_info(self):
         """Obtiene información del modelo"""
         return {
             'is_trained': self.is_trained,
-            'model_path': self.model_path,
-            'model_type': 'RandomForestClassifier',
+            'is_loaded': self.is_trained and self._pending_model is None,
+            'model_path': self.registry.path_for(self.model_version) if self.model_version else self.model_path,
+            'model_version': self.model_version,
+            # Con bosque plano el estimador puede no estar cargado todavía, pero es un RandomForestClassifier
+            'model_type': type(self.model).__name__ if self.model is not None else (
+                'RandomForestClassifier' if self.flat_forest is not None else None),
+            'backend': self.backend,
             'features_used': [
                 'semester', 'credits_percentage', 'gpa', 'career_encoded',
                 'skills_count', 'languages_count', 'experience_count',
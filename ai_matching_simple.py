@@ -1,14 +1,8 @@
 # Versión simplificada de ai_matching.py para Windows
 # Sin dependencias problemáticas como matplotlib y seaborn
 
+# sklearn y joblib se importan al primer uso: importarlos tarda más de un segundo
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-import joblib
 import os
 from datetime import datetime
 import json
@@ -17,11 +11,24 @@ class AIMatchingEngine:
     """Motor de matching inteligente usando técnicas de Machine Learning"""
     
     def __init__(self):
+        self.vectorizer = None
+        self.scaler = None
+        self.model = None
+        self.is_trained = False
+        self.model_path = './models/ai_matching_model.pkl'
+    
+    def _init_components(self):
+        """Crea vectorizador, escalador y modelo de sklearn si todavía no existen"""
+        if self.model is not None:
+            return
+        
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.ensemble import RandomForestClassifier
+        
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
         self.scaler = StandardScaler()
         self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.is_trained = False
-        self.model_path = './models/ai_matching_model.pkl'
         
     def prepare_student_features(self, student):
         """Prepara características del estudiante para el modelo"""
@@ -74,6 +81,9 @@ class AIMatchingEngine:
             if not student_text.strip() or not opportunity_text.strip():
                 return 0.0
             
+            from sklearn.metrics.pairwise import cosine_similarity
+            self._init_components()
+            
             # Vectorizar textos
             texts = [student_text, opportunity_text]
             tfidf_matrix = self.vectorizer.fit_transform(texts)
@@ -192,6 +202,9 @@ class AIMatchingEngine:
             X = np.array(X)
             y = np.array(y)
             
+            from sklearn.model_selection import train_test_split
+            self._init_components()
+            
             # Dividir datos
             X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=0.2, random_state=42
@@ -344,6 +357,8 @@ class AIMatchingEngine:
     
     def _save_model(self):
         """Guarda el modelo entrenado"""
+        import joblib
+        
         try:
             os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
             
@@ -362,6 +377,8 @@ class AIMatchingEngine:
     
     def load_model(self):
         """Carga el modelo entrenado"""
+        import joblib
+        
         try:
             if os.path.exists(self.model_path):
                 model_data = joblib.load(self.model_path)
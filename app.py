@@ -72,6 +72,11 @@ def create_app():
 
 app = create_app()
 
+@app.before_request
+def refresh_matching_model():
+    """Cambia a la versión más reciente del modelo de IA entre solicitudes"""
+    matching_engine.check_for_model_update()
+
 @app.route('/')
 def index():
     """Página principal"""
@@ -138,6 +143,16 @@ def health_check():
         'timestamp': datetime.utcnow().isoformat()
     })
 
+@app.route('/api/diagnostics/matching')
+@admin_required
+def matching_diagnostics():
+    """Estado del modelo y uso de las cachés del motor de matching"""
+    return jsonify({
+        'model': matching_engine.get_model_info(),
+        'score_cache': matching_engine.score_cache.stats(),
+        'feature_cache': matching_engine.feature_cache.stats()
+    })
+
 @app.route('/api/init', methods=['POST'])
 def initialize_system():
     """Inicializar sistema con datos de ejemplo"""
@@ -215,6 +215,12 @@ def setup_routes(app):
                 'error': str(e)
             })
     
+    @app.before_request
+    def refresh_matching_model():
+        """Cambia a la versión más reciente del modelo de IA entre solicitudes"""
+        if matching_engine:
+            matching_engine.check_for_model_update()
+    
     @app.route('/api/health')
     def health_check():
         """Verificación de salud de la API"""
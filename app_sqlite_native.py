@@ -10,6 +10,8 @@ from flask import Flask, request, jsonify, render_template
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_cors import CORS
 import sqlite3
+from database_native import db_manager, recommendation_model
+from recommendations import RecommendationRefresher, SingleFlight, SkillIndex
 
 # Verificar Python version
 if sys.version_info < (3, 8):
@@ -31,6 +33,24 @@ cors = CORS(app, resources={r"/api/*": {"origins": "*"}})
 # Configuración de base de datos
 DB_PATH = 'vinculacion_unrc.db'
 
+# Recomendaciones precalculadas, actualizadas al cambiar estudiantes u oportunidades. Se usa la
+# instancia global de database_native: es la que notifican los modelos (Student.update, etc.)
+SKILL_EXPLORATION_SIZE = int(os.getenv('SKILL_EXPLORATION_SIZE', 20))
+skill_index = SkillIndex(exploration_size=SKILL_EXPLORATION_SIZE).load(db_manager)
+recommendation_refresher = RecommendationRefresher(db_manager, recommendation_model, skill_index=skill_index)
+
+# Solicitudes simultáneas del mismo estudiante comparten un cálculo; el resultado se reutiliza unos segundos
+RECOMMENDATION_CACHE_TTL = float(os.getenv('RECOMMENDATION_CACHE_TTL', 30))
+recommendation_flight = SingleFlight(ttl=RECOMMENDATION_CACHE_TTL)
+
+def invalidate_student_recommendations(entity, entity_id):
+    """Descarta el resultado cacheado de un estudiante que cambió"""
+    if entity == 'student':
+        recommendation_flight.invalidate(lambda key: key[0] == entity_id)
+
+# Registrado después del refresher: se invalida cuando la tabla ya tiene las recomendaciones nuevas
+db_manager.add_listener(invalidate_student_recommendations)
+
 def init_database():
     """Inicializar base de datos SQLite"""
     try:
@@ -154,8 +174,7 @@ def verify_password(password: str, password_hash: str) -> bool:
 def execute_query(query: str, params: tuple = ()) -> list:
     """Ejecutar consulta y retornar resultados"""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            conn.row_factory = sqlite3.Row
+        with db_manager.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             rows = cursor.fetchall()
@@ -166,27 +185,11 @@ def execute_query(query: str, params: tuple = ()) -> list:
 
 def execute_update(query: str, params: tuple = ()) -> int:
     """Ejecutar consulta de actualización"""
-    try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
-    except Exception as e:
-        print(f"Error ejecutando actualización: {e}")
-        return 0
+    return db_manager.execute_update(query, params)
 
 def execute_insert(query: str, params: tuple = ()) -> int:
     """Ejecutar consulta de inserción"""
-    try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid
-    except Exception as e:
-        print(f"Error ejecutando inserción: {e}")
-        return 0
+    return db_manager.execute_insert(query, params)
 
 # Rutas de la API
 @app.route('/')
@@ -211,6 +214,7 @@ def health_check():
         'timestamp': datetime.utcnow().isoformat(),
         'python_version': sys.version,
         'database': 'SQLite Native',
+        'storage': db_manager.storage_stats(),
         'features': {
             'authentication': 'JWT',
             'database': 'SQLite Native',
@@ -523,6 +527,7 @@ def initialize_system():
              'internship', json.dumps(['Python', 'JavaScript', 'React']), 6,
              json.dumps(['Ingeniería en Sistemas']), 6, 40, 15000.0, 'Ciudad de México')
         )
+        db_manager.notify_change('opportunity', opportunity_id)
         
         return jsonify({
             'message': 'Sistema inicializado exitosamente',
@@ -537,6 +542,36 @@ def initialize_system():
     except Exception as e:
         return jsonify({'error': f'Error inicializando sistema: {str(e)}'}), 500
 
+def compute_recommendations(student_id):
+    """Top 10 de recomendaciones de un estudiante y su total"""
+    # Primera consulta del estudiante: calcular y persistir sus recomendaciones
+    if not recommendation_model.is_computed(student_id):
+        recommendation_refresher.refresh_student(student_id)
+    total = recommendation_model.count_for_student(student_id)
+    
+    # Lectura por índice de las mejores recomendaciones
+    recommendations = [
+        {
+            'opportunity': {
+                'id': row['id'],
+                'title': row['title'],
+                'description': row['description'],
+                'type': row['type'],
+                'duration_months': row['duration_months'],
+                'hours_per_week': row['hours_per_week'],
+                'salary': row['salary'],
+                'location': row['location']
+            },
+            'match_score': row['score']
+        }
+        for row in recommendation_model.get_for_student(student_id, limit=10)
+    ]
+    
+    return {
+        'recommendations': recommendations,  # Top 10
+        'total': total
+    }
+
 @app.route('/api/students/recommendations/<int:student_id>', methods=['GET'])
 @jwt_required()
 def get_recommendations(student_id):
@@ -549,58 +584,15 @@ def get_recommendations(student_id):
         if not users or users[0]['role'] not in ['admin'] and current_user_id != student_id:
             return jsonify({'error': 'No tienes permisos para ver recomendaciones'}), 403
         
-        # Obtener estudiante
-        students = execute_query('SELECT * FROM students WHERE id = ?', (student_id,))
+        # Verificar que el estudiante existe
+        students = execute_query('SELECT id FROM students WHERE id = ?', (student_id,))
         if not students:
             return jsonify({'error': 'Estudiante no encontrado'}), 404
         
-        student = students[0]
-        
-        # Obtener oportunidades activas
-        opportunities = execute_query('SELECT * FROM opportunities WHERE is_active = 1')
-        
-        # Filtrar oportunidades según perfil del estudiante
-        recommendations = []
-        for opp in opportunities:
-            # Verificar requisitos básicos
-            if opp['required_semester'] and student['semester'] < opp['required_semester']:
-                continue
-            if opp['required_credits'] and student['credits_percentage'] < opp['required_credits']:
-                continue
-            
-            # Calcular score de compatibilidad básico
-            match_score = 0.5  # Score básico
-            
-            # Ajustar score según habilidades
-            if opp['required_skills']:
-                required_skills = json.loads(opp['required_skills'])
-                student_skills = json.loads(student['skills_technical']) if student['skills_technical'] else []
-                common_skills = set(student_skills).intersection(set(required_skills))
-                if required_skills:
-                    match_score += len(common_skills) / len(required_skills) * 0.3
-            
-            if match_score >= 0.3:  # Solo mostrar oportunidades con score >= 30%
-                recommendations.append({
-                    'opportunity': {
-                        'id': opp['id'],
-                        'title': opp['title'],
-                        'description': opp['description'],
-                        'type': opp['type'],
-                        'duration_months': opp['duration_months'],
-                        'hours_per_week': opp['hours_per_week'],
-                        'salary': opp['salary'],
-                        'location': opp['location']
-                    },
-                    'match_score': round(match_score, 2)
-                })
-        
-        # Ordenar por score de compatibilidad
-        recommendations.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        return jsonify({
-            'recommendations': recommendations[:10],  # Top 10
-            'total': len(recommendations)
-        }), 200
+        # Cambios del catálogo hechos por otros workers (cada proceso tiene su índice y su caché)
+        recommendation_refresher.sync()
+        key = (student_id, recommendation_refresher.catalog_version, recommendation_refresher.model_version)
+        return jsonify(recommendation_flight.do(key, lambda: compute_recommendations(student_id))), 200
         
     except Exception as e:
         return jsonify({'error': f'Error al obtener recomendaciones: {str(e)}'}), 500
@@ -677,7 +669,8 @@ def get_dashboard():
                 'total_applications': total_applications
             },
             'applications_by_status': {row['status']: row['count'] for row in applications_by_status},
-            'students_by_career': {row['career']: row['count'] for row in students_by_career}
+            'students_by_career': {row['career']: row['count'] for row in students_by_career},
+            'recommendation_cache': recommendation_flight.stats()
         }), 200
         
     except Exception as e:
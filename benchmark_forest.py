@@ -0,0 +1,100 @@
+"""
+Benchmark de la inferencia del bosque exportado a arreglos planos contra sklearn
+
+Compara FlatForest.predict_proba con RandomForestClassifier.predict_proba: diferencia máxima
+de probabilidades, coincidencia tras el redondeo a 3 decimales del motor y latencia según el
+tamaño del lote (para elegir flat_forest_max_rows del motor).
+
+Uso:
+    python benchmark_forest.py --rows 5000 --trees 100
+    python benchmark_forest.py --model models/registry/<versión>.estimator.pkl
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ai_matching import FlatForest
+
+N_FEATURES = 17  # Características combinadas estudiante + oportunidad del motor
+
+def train_synthetic(n_rows, n_trees, seed=42):
+    """Entrena un bosque sobre datos sintéticos con la forma de las características del motor"""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, N_FEATURES))
+    y = (X[:, 0] + X[:, 3] * X[:, 7] + rng.standard_normal(n_rows) * 0.5 > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=n_trees, random_state=seed, n_jobs=1)
+    model.fit(X, y)
+    return model, rng.standard_normal((n_rows, N_FEATURES))
+
+def timed(function, repeat):
+    """Tiempo medio (ms) de una llamada"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+def benchmark(model, X, batch_sizes=(1, 10, 100, 1000)):
+    """Compara exactitud y latencia de ambas rutas"""
+    started = time.perf_counter()
+    flat = FlatForest.from_model(model)
+    export_seconds = time.perf_counter() - started
+
+    expected = model.predict_proba(X)
+    actual = flat.predict_proba(X)
+
+    results = {
+        'trees': flat.n_trees,
+        'nodes': len(flat.feature),
+        'max_depth': flat.max_depth,
+        'rows': len(X),
+        'export_seconds': round(export_seconds, 3),
+        'max_abs_diff': float(np.abs(expected - actual).max()),
+        'rounded_equal': bool(np.array_equal(np.round(expected[:, 1], 3), np.round(actual[:, 1], 3)))
+    }
+
+    for size in list(batch_sizes) + [len(X)]:
+        batch = X[:size]
+        repeat = max(3, 200 // size)
+        results[f'sklearn_{size}_rows_ms'] = round(timed(lambda: model.predict_proba(batch), repeat), 3)
+        results[f'flat_{size}_rows_ms'] = round(timed(lambda: flat.predict_proba(batch), repeat), 3)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Inferencia del bosque en arreglos planos contra sklearn')
+    parser.add_argument('--model', help='Estimador guardado por el registro de modelos (o artefacto anterior al registro)')
+    parser.add_argument('--rows', type=int, default=5000, help='Filas sintéticas para entrenar y evaluar')
+    parser.add_argument('--trees', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.model:
+        model = joblib.load(args.model)
+        if isinstance(model, dict):  # Artefacto anterior al registro, con el estimador dentro
+            model = model['model']
+        X = np.random.default_rng(0).standard_normal((args.rows, model.n_features_in_))
+    else:
+        model, X = train_synthetic(args.rows, args.trees)
+
+    if FlatForest.from_model(model) is None:
+        print(f"El modelo {type(model).__name__} no es un RandomForestClassifier entrenado")
+        return
+
+    results = benchmark(model, X)
+
+    print("=" * 60)
+    print("BENCHMARK DEL BOSQUE EN ARREGLOS PLANOS")
+    print("=" * 60)
+    for key, value in results.items():
+        print(f"   {key}: {value}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark de los perfiles de almacenamiento de SQLite bajo carga concurrente
+
+Para cada perfil de STORAGE_PROFILES crea una base temporal con datos sintéticos y corre al
+mismo tiempo lectores (consultas de analytics y búsquedas por id) y escritores (registros de
+estudiantes: usuario + estudiante). Reporta lecturas y escrituras por segundo, latencia de
+escritura, errores ("database is locked") y el tamaño final del WAL. Con --write-queue cada
+perfil se corre también con las escrituras pasando por el hilo escritor único (WriteQueue).
+
+Uso:
+    python benchmark_storage.py
+    python benchmark_storage.py --profiles default wal --readers 8 --writers 4 --seconds 10
+    python benchmark_storage.py --profiles wal_durable --writers 16 --write-queue
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database_native import DatabaseManager, STORAGE_PROFILES
+
+CAREERS = ['Ingeniería en Sistemas', 'Ingeniería Industrial', 'Administración', 'Contaduría', 'Mercadotecnia']
+STATUSES = ['pending', 'reviewed', 'accepted', 'rejected']
+
+ANALYTICS_QUERIES = [
+    'SELECT career, COUNT(*) AS count, AVG(gpa) AS gpa FROM students GROUP BY career',
+    'SELECT status, COUNT(*) AS count FROM applications GROUP BY status',
+]
+
+def seed(db, n_students, n_applications, rng):
+    """Usuarios, estudiantes y postulaciones sintéticos"""
+    db.execute_transaction([
+        ('INSERT INTO users (id, email, password_hash, role) VALUES (?, ?, ?, ?)',
+         [(i, f'seed{i}@unrc.edu.mx', 'x', 'student') for i in range(1, n_students + 1)]),
+        ('''INSERT INTO students (user_id, first_name, last_name, student_id, career, semester, gpa)
+            VALUES (?, ?, ?, ?, ?, ?, ?)''',
+         [(i, 'Nombre', 'Apellido', f'S{i}', rng.choice(CAREERS), rng.randint(1, 10), rng.uniform(6, 10))
+          for i in range(1, n_students + 1)]),
+        ('INSERT INTO applications (student_id, opportunity_id, status) VALUES (?, ?, ?)',
+         [(rng.randint(1, n_students), rng.randint(1, 500), rng.choice(STATUSES)) for _ in range(n_applications)]),
+    ])
+
+def run_profile(profile, args, write_queue=False):
+    """Corre la carga mixta sobre una base nueva con el perfil dado"""
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(tmp_dir, 'benchmark.db'), pool_size=args.readers + args.writers + 1,
+                             profile=profile, write_queue=write_queue)
+        if db.checkpointer is not None:
+            db.checkpointer.interval = args.checkpoint_interval
+        seed(db, args.students, args.applications, random.Random(42))
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        counts = {'reads': 0, 'writes': 0, 'write_errors': 0}
+        write_latencies = []
+
+        def reader(seed_value):
+            rng = random.Random(seed_value)
+            reads = 0
+            while not stop.is_set():
+                if rng.random() < args.analytics_ratio:
+                    db.execute_query(rng.choice(ANALYTICS_QUERIES))
+                else:
+                    db.execute_query('SELECT id, email, role FROM users WHERE id = ?',
+                                     (rng.randint(1, args.students),))
+                reads += 1
+            with lock:
+                counts['reads'] += reads
+
+        def writer(seed_value):
+            rng = random.Random(seed_value)
+            writes, errors, latencies = 0, 0, []
+            while not stop.is_set():
+                started = time.perf_counter()
+                token = f'{seed_value}-{writes + errors}'
+                user_id = db.execute_insert(
+                    'INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)',
+                    (f'nuevo{token}@unrc.edu.mx', 'x', 'student')
+                )
+                student_id = user_id and db.execute_insert(
+                    '''INSERT INTO students (user_id, first_name, last_name, student_id, career, semester)
+                       VALUES (?, ?, ?, ?, ?, ?)''',
+                    (user_id, 'Nuevo', 'Estudiante', f'N{token}', rng.choice(CAREERS), 1)
+                )
+                if student_id:
+                    writes += 1
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+            with lock:
+                counts['writes'] += writes
+                counts['write_errors'] += errors
+                write_latencies.extend(latencies)
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+        threads += [threading.Thread(target=writer, args=(1000 + i,)) for i in range(args.writers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        write_latencies.sort()
+        results = {
+            'reads_per_second': round(counts['reads'] / elapsed, 1),
+            'writes_per_second': round(counts['writes'] / elapsed, 1),
+            'write_errors': counts['write_errors'],
+            'write_p50_ms': round(statistics.median(write_latencies), 2) if write_latencies else None,
+            'write_p95_ms': round(write_latencies[int(len(write_latencies) * 0.95)], 2) if write_latencies else None,
+            'pool_max_wait_ms': db.pool.stats()['max_wait_ms'],
+            'wal': db.checkpointer.stats() if db.checkpointer is not None else None,
+            'write_queue': db.write_queue.stats() if db.write_queue is not None else None
+        }
+        db.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Rendimiento de los perfiles de almacenamiento de SQLite')
+    parser.add_argument('--profiles', nargs='*', default=list(STORAGE_PROFILES), choices=list(STORAGE_PROFILES))
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--applications', type=int, default=50000)
+    parser.add_argument('--analytics-ratio', type=float, default=0.2,
+                        help='Fracción de lecturas que son consultas de analytics (el resto, por id)')
+    parser.add_argument('--checkpoint-interval', type=float, default=1.0)
+    parser.add_argument('--write-queue', action='store_true',
+                        help='Comparar cada perfil con y sin el hilo escritor único')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"PERFILES DE ALMACENAMIENTO ({args.readers} lectores, {args.writers} escritores, {args.seconds:.0f} s)")
+    print("=" * 60)
+    for profile in args.profiles:
+        for write_queue in ([False, True] if args.write_queue else [False]):
+            results = run_profile(profile, args, write_queue=write_queue)
+            print(f"\n{profile}{' + write_queue' if write_queue else ''}:")
+            for key, value in results.items():
+                if value is not None:
+                    print(f"   {key}: {json.dumps(value) if isinstance(value, dict) else value}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Medición del tiempo de importación de la aplicación contra un presupuesto
+
+Importa cada módulo en un proceso nuevo (varias veces, se reporta la mediana) y lista los
+submódulos más costosos según `python -X importtime`. Termina con código 1 si algún módulo
+supera el presupuesto, para usarlo en CI o antes de desplegar.
+
+Uso:
+    python check_import_time.py
+    python check_import_time.py app ai_matching --budget-ms 400 --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['ai_matching', 'app']
+DEFAULT_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', 500))
+
+def measure(module, runs):
+    """Mediana del tiempo de importación (ms) y los submódulos más costosos de la última corrida"""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - started) * 1000)"
+    )
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'error desconocido'
+            return None, error
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+
+    # Formato de -X importtime: "import time: self [us] | cumulative | módulo"
+    heaviest = []
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2].strip()
+            if '.' not in name and name != module:
+                heaviest.append((int(parts[1]) / 1000, name))
+    heaviest.sort(reverse=True)
+
+    return statistics.median(times), heaviest[:5]
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de importación contra un presupuesto')
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"TIEMPO DE IMPORTACIÓN (presupuesto {args.budget_ms:.0f} ms)")
+    print("=" * 60)
+
+    over_budget = False
+    for module in args.modules:
+        elapsed, details = measure(module, args.runs)
+        if elapsed is None:
+            print(f"⚠️  {module}: no se pudo importar ({details})")
+            continue
+
+        status = '✅' if elapsed <= args.budget_ms else '❌'
+        over_budget = over_budget or elapsed > args.budget_ms
+        print(f"{status} {module}: {elapsed:.0f} ms")
+        for cumulative_ms, name in details:
+            print(f"      {name}: {cumulative_ms:.0f} ms")
+
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == '__main__':
+    main()
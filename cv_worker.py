@@ -0,0 +1,42 @@
+# Evaluación de folds de validación cruzada en procesos del pool
+# Plataforma de Vinculación UNRC
+"""
+Código que ejecutan los procesos de validación cruzada de AIMatchingEngine
+
+Con el método de arranque spawn, cada proceso nuevo vuelve a ejecutar el módulo __main__
+del padre (como __mp_main__). Si el entrenamiento se lanza desde el servidor, ese módulo es
+app.py y cada worker arrancaría la aplicación Flask completa. Por eso el pool se crea con
+este módulo como __main__ (spawn_without_main) y los workers solo importan NumPy y, al
+evaluar, sklearn.
+"""
+
+import sys
+from contextlib import contextmanager
+
+def evaluate_fold(params, X, y, train_index, test_index):
+    """Entrena y evalúa un candidato en un fold (se ejecuta en un proceso del pool)"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_index])
+    X_test = scaler.transform(X[test_index])
+    
+    # Un solo núcleo por árbol: el paralelismo lo aporta el pool de procesos
+    model = RandomForestClassifier(random_state=42, n_jobs=1, **params)
+    model.fit(X_train, y[train_index])
+    return model.score(X_test, y[test_index])
+
+@contextmanager
+def spawn_without_main():
+    """Mientras está activo, los procesos creados con spawn importan este módulo como __main__
+    
+    ProcessPoolExecutor con spawn crea sus procesos dentro de submit(), en el hilo que llama,
+    así que basta con envolver los submit.
+    """
+    main_module = sys.modules['__main__']
+    sys.modules['__main__'] = sys.modules[__name__]
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main_module
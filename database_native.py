@@ -4,15 +4,507 @@
 import sqlite3
 import json
 import hashlib
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 import os
 
+from migrations import MigrationRunner
+from recommendations import OPEN_OPPORTUNITY_FILTER
+
+# Perfiles de almacenamiento: modo del journal (persistente en el archivo, se fija al iniciar)
+# y pragmas que se aplican una sola vez al crear cada conexión del pool
+STORAGE_PROFILES = {
+    # Journal de rollback: los lectores bloquean el commit de los escritores
+    'default': {
+        'journal_mode': None,
+        'pragmas': {
+            'temp_store': 'MEMORY',
+            'cache_size': -8000,  # 8 MB de caché de páginas por conexión (las conexiones persisten)
+            'busy_timeout': 5000
+        }
+    },
+    # WAL: lectores y escritor no se bloquean entre sí. Con synchronous NORMAL la base no se
+    # corrompe; ante un corte de energía solo pueden perderse los últimos commits
+    'wal': {
+        'journal_mode': 'WAL',
+        'pragmas': {
+            'synchronous': 'NORMAL',
+            'cache_size': -16000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+            'journal_size_limit': 64 * 1024 * 1024
+        }
+    },
+    # WAL con fsync en cada commit
+    'wal_durable': {
+        'journal_mode': 'WAL',
+        'pragmas': {
+            'synchronous': 'FULL',
+            'cache_size': -16000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+            'journal_size_limit': 64 * 1024 * 1024
+        }
+    }
+}
+DEFAULT_PRAGMAS = STORAGE_PROFILES['default']['pragmas']
+
+# Formatos de fila de DatabaseManager.iter_query
+ROW_FORMATS = ('dict', 'tuple', 'record', 'columns')
+
+@lru_cache(maxsize=256)
+def record_type(columns: tuple):
+    """Tipo de fila ligero (namedtuple, sin __dict__) para un conjunto de columnas"""
+    return namedtuple('Record', columns, rename=True)
+
+class ConnectionPool:
+    """Pool de conexiones SQLite reutilizables
+    
+    Cada conexión se abre una sola vez, con sus pragmas, y vuelve al pool al terminar cada
+    operación. Las operaciones anidadas de un mismo hilo reutilizan la conexión que el hilo ya
+    tiene. Si se agotan las size conexiones, la siguiente espera hasta timeout segundos.
+    """
+    
+    def __init__(self, db_path: str, size: int = 8, timeout: float = 30.0, pragmas: Optional[Dict] = None):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self):
+        # Las conexiones no se comparten con procesos hijos: tras un fork se empieza de cero
+        self.pid = os.getpid()
+        self.idle = queue.LifoQueue()
+        self.local = threading.local()
+        self.open_connections = 0
+        self.created = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Tomar una conexión del pool (o la que el hilo ya tiene)"""
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self._reset()
+        
+        held = getattr(self.local, 'connection', None)
+        if held is not None:
+            self.local.depth += 1
+            return held
+        
+        started = time.perf_counter()
+        waited = False
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                create = self.open_connections < self.size
+                if create:
+                    self.open_connections += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self.lock:
+                        self.open_connections -= 1
+                    raise
+                with self.lock:
+                    self.created += 1
+            else:
+                waited = True
+                try:
+                    conn = self.idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f'Pool de conexiones agotado ({self.size}) tras {self.timeout} s'
+                    )
+        
+        wait = time.perf_counter() - started
+        with self.lock:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        
+        self.local.connection = conn
+        self.local.depth = 1
+        return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        """Devolver la conexión al pool; una transacción sin confirmar se revierte"""
+        self.local.depth -= 1
+        if self.local.depth > 0:
+            return
+        self.local.connection = None
+        
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self.lock:
+                self.open_connections -= 1
+            return
+        self.idle.put(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Conexión del pool durante el bloque with"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def close(self):
+        """Cerrar las conexiones libres"""
+        while True:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self.lock:
+                self.open_connections -= 1
+    
+    def stats(self) -> Dict:
+        """Conexiones abiertas y tiempo de espera para obtener una"""
+        with self.lock:
+            return {
+                'size': self.size,
+                'open': self.open_connections,
+                'idle': self.idle.qsize(),
+                'in_use': self.open_connections - self.idle.qsize(),
+                'created': self.created,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'avg_wait_ms': round(self.wait_seconds / self.waits * 1000, 3) if self.waits else 0.0,
+                'max_wait_ms': round(self.max_wait_seconds * 1000, 3)
+            }
+
+class WalCheckpointer:
+    """Checkpoints del WAL en segundo plano para mantener acotado el archivo -wal
+    
+    Cada interval segundos hace un checkpoint PASSIVE, que no espera a nadie. Si el archivo
+    supera max_wal_bytes (p. ej. porque lecturas largas impidieron reiniciarlo) usa TRUNCATE,
+    que espera a los lectores y lo deja en cero bytes.
+    """
+    
+    def __init__(self, pool: ConnectionPool, interval: float = 30.0, max_wal_bytes: int = 64 * 1024 * 1024):
+        self.pool = pool
+        self.interval = interval
+        self.max_wal_bytes = max_wal_bytes
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.pid = None
+        self.checkpoints = 0
+        self.truncations = 0
+        self.busy = 0
+        self.errors = 0
+        self.last_result = None
+    
+    @property
+    def wal_path(self) -> str:
+        return f"{self.pool.db_path}-wal"
+    
+    def wal_bytes(self) -> int:
+        """Tamaño actual del archivo -wal"""
+        try:
+            return os.path.getsize(self.wal_path)
+        except OSError:
+            return 0
+    
+    def ensure_running(self):
+        """Arrancar el hilo si no corre en este proceso (p. ej. tras un fork)"""
+        if self.pid == os.getpid() or self.stop_event.is_set():
+            return
+        
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.thread = threading.Thread(target=self._run, name='wal-checkpointer', daemon=True)
+            self.thread.start()
+            self.pid = os.getpid()
+    
+    def stop(self):
+        """Detener el hilo"""
+        self.stop_event.set()
+        if self.thread is not None and self.pid == os.getpid():
+            self.thread.join()
+    
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.checkpoint()
+    
+    def checkpoint(self) -> Optional[tuple]:
+        """Un checkpoint según el tamaño del WAL; devuelve (busy, páginas en el log, copiadas)"""
+        mode = 'TRUNCATE' if self.wal_bytes() > self.max_wal_bytes else 'PASSIVE'
+        try:
+            with self.pool.connection() as conn:
+                result = tuple(conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone())
+        except sqlite3.Error as e:
+            print(f"Error en checkpoint del WAL: {e}")
+            with self.lock:
+                self.errors += 1
+            return None
+        
+        with self.lock:
+            self.checkpoints += 1
+            self.truncations += mode == 'TRUNCATE'
+            self.busy += bool(result[0])
+            self.last_result = {'mode': mode, 'busy': result[0], 'log_frames': result[1],
+                                'checkpointed_frames': result[2]}
+        return result
+    
+    def stats(self) -> Dict:
+        """Tamaño del WAL y resultado de los checkpoints"""
+        with self.lock:
+            return {
+                'running': self.pid == os.getpid() and not self.stop_event.is_set(),
+                'wal_bytes': self.wal_bytes(),
+                'max_wal_bytes': self.max_wal_bytes,
+                'checkpoints': self.checkpoints,
+                'truncations': self.truncations,
+                'busy': self.busy,
+                'errors': self.errors,
+                'last': self.last_result
+            }
+
+def apply_operations(cursor: sqlite3.Cursor, operations: List[tuple]):
+    """Ejecutar operaciones (query, params); si params es una lista se usa executemany"""
+    for query, params in operations:
+        if isinstance(params, list):
+            cursor.executemany(query, params)
+        else:
+            cursor.execute(query, params)
+
+def write_result(cursor: sqlite3.Cursor, result: str):
+    """Resultado de una escritura: 'rowcount', 'lastrowid' o True"""
+    if result == 'rowcount':
+        return cursor.rowcount
+    if result == 'lastrowid':
+        return cursor.lastrowid
+    return True
+
+class WriteQueue:
+    """Hilo escritor único con commit agrupado
+    
+    Las escrituras se encolan y un solo hilo, con su propia conexión, las aplica: toma todo lo
+    que haya en la cola (hasta max_batch) y lo confirma en una única transacción, de modo que
+    los escritores del proceso no compiten por el lock ni pagan un fsync cada uno. Cada
+    escritura va en su propio SAVEPOINT, así un error solo revierte la suya; quien la encoló
+    recibe el resultado (o la excepción) por un Future después del COMMIT. Si nadie la toma en
+    timeout segundos, la espera se cancela y la escritura ya no se aplica.
+    """
+    
+    def __init__(self, pool: ConnectionPool, max_batch: int = 256, timeout: float = 30.0):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+        self.queue = None
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.restarts = 0
+        self.max_batch_seen = 0
+        self.wait_seconds = 0.0
+    
+    def ensure_running(self):
+        """Arrancar el hilo si no corre en este proceso (tras un fork o si terminó por un error)"""
+        if self.pid == os.getpid() and self.thread.is_alive():
+            return
+        
+        with self.lock:
+            if self.pid == os.getpid() and self.thread.is_alive():
+                return
+            if self.pid == os.getpid():
+                # Mismo proceso: las escrituras que ya estaban en la cola siguen pendientes
+                self.restarts += 1
+            else:
+                self.queue = queue.Queue()
+            self.thread = threading.Thread(target=self._run, args=(self.queue,), name='sqlite-writer', daemon=True)
+            self.thread.start()
+            self.pid = os.getpid()
+    
+    def submit(self, operations: List[tuple], result: str = 'ok') -> Future:
+        """Encolar una escritura; el Future devuelve write_result de su última operación"""
+        self.ensure_running()
+        future = Future()
+        self.queue.put((operations, result, future, time.perf_counter()))
+        return future
+    
+    def execute(self, operations: List[tuple], result: str = 'ok'):
+        """Encolar una escritura y esperar su resultado (hasta timeout segundos)"""
+        future = self.submit(operations, result)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Si el escritor todavía no la tomó se descarta; si ya la tomó puede confirmarse igual
+            if future.cancel():
+                raise FutureTimeoutError(f'Escritura no aplicada tras {self.timeout} s en cola')
+            raise FutureTimeoutError(f'Escritura sin confirmar tras {self.timeout} s')
+    
+    def stop(self):
+        """Aplicar lo pendiente y detener el hilo"""
+        if self.thread is not None and self.pid == os.getpid():
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+            self.pid = None
+    
+    def _run(self, pending: queue.Queue):
+        conn = None
+        stopping = False
+        while not stopping:
+            item = pending.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            # Las escrituras cuya espera ya se canceló no se aplican
+            ready = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if len(ready) < len(batch):
+                with self.lock:
+                    self.cancelled += len(batch) - len(ready)
+            batch = ready
+            if not batch:
+                continue
+            
+            try:
+                if conn is None:
+                    conn = self.pool._connect()
+                    conn.isolation_level = None  # El hilo controla BEGIN/COMMIT
+                self._apply_batch(conn, batch)
+            except Exception as e:
+                # Error inesperado fuera de una escritura: se informa a quienes esperan, se
+                # descarta la conexión (su estado es desconocido) y el hilo sigue atendiendo
+                print(f"Error en el hilo escritor: {e}")
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+        
+        if conn is not None:
+            conn.close()
+    
+    def _apply_batch(self, conn: sqlite3.Connection, batch: List[tuple]):
+        outcomes = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for operations, result, future, _ in batch:
+                cursor = conn.cursor()
+                cursor.execute('SAVEPOINT write')
+                try:
+                    apply_operations(cursor, operations)
+                    outcomes.append((future, write_result(cursor, result), None))
+                    cursor.execute('RELEASE write')
+                except Exception as e:
+                    # Cualquier error (también OverflowError, TypeError de parámetros) es de esta escritura
+                    cursor.execute('ROLLBACK TO write')
+                    cursor.execute('RELEASE write')
+                    outcomes.append((future, None, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            # Falló el BEGIN, un SAVEPOINT o el COMMIT: no se aplicó nada del lote
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            outcomes = [(future, None, e) for _, _, future, _ in batch]
+        
+        finished = time.perf_counter()
+        with self.lock:
+            self.batches += 1
+            self.writes += len(batch)
+            self.failed += sum(error is not None for _, _, error in outcomes)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.wait_seconds += sum(finished - item[3] for item in batch)
+        for future, value, error in outcomes:
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+    
+    def stats(self) -> Dict:
+        """Lotes confirmados, tamaño medio de lote y latencia de las escrituras encoladas"""
+        with self.lock:
+            return {
+                'running': self.pid == os.getpid() and self.thread is not None and self.thread.is_alive(),
+                'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+                'batches': self.batches,
+                'writes': self.writes,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+                'restarts': self.restarts,
+                'avg_batch': round(self.writes / self.batches, 2) if self.batches else 0.0,
+                'max_batch': self.max_batch_seen,
+                'avg_latency_ms': round(self.wait_seconds / self.writes * 1000, 3) if self.writes else 0.0
+            }
+
 class DatabaseManager:
-    """Gestor de base de datos usando SQLite nativo"""
+    """Gestor de base de datos usando SQLite nativo
+    
+    profile elige un perfil de STORAGE_PROFILES (por defecto DB_STORAGE_PROFILE o 'default');
+    con los perfiles WAL un hilo hace checkpoints periódicos a partir de la primera escritura.
+    Con write_queue (por defecto DB_WRITE_QUEUE=1) las escrituras pasan por un WriteQueue.
+    """
     
-    def __init__(self, db_path: str = "vinculacion_unrc.db"):
+    def __init__(self, db_path: str = "vinculacion_unrc.db", pool_size: Optional[int] = None,
+                 profile: Optional[str] = None, write_queue: Optional[bool] = None):
         self.db_path = db_path
+        self.listeners = []
+        self.profile = profile or os.getenv('DB_STORAGE_PROFILE', 'default')
+        if self.profile not in STORAGE_PROFILES:
+            raise ValueError(f"Perfil de almacenamiento desconocido: {self.profile}")
+        storage = STORAGE_PROFILES[self.profile]
+        self.pool = ConnectionPool(
+            db_path, size=pool_size or int(os.getenv('DB_POOL_SIZE', 8)), pragmas=storage['pragmas']
+        )
+        self.checkpointer = WalCheckpointer(
+            self.pool, interval=float(os.getenv('DB_CHECKPOINT_INTERVAL', 30))
+        ) if storage['journal_mode'] == 'WAL' else None
+        if write_queue is None:
+            write_queue = os.getenv('DB_WRITE_QUEUE', '0') == '1'
+        self.write_queue = WriteQueue(self.pool) if write_queue else None
         self.init_database()
     
     def init_database(self):
@@ -21,6 +513,10 @@ class DatabaseManager:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
+                journal_mode = STORAGE_PROFILES[self.profile]['journal_mode']
+                if journal_mode:
+                    cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+                
                 # Tabla de usuarios
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS users (
@@ -197,8 +693,40 @@ class DatabaseManager:
                     )
                 ''')
                 
+                # Tabla de recomendaciones precalculadas
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS recommendations (
+                        student_id INTEGER NOT NULL,
+                        opportunity_id INTEGER NOT NULL,
+                        score REAL NOT NULL,
+                        computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (student_id, opportunity_id),
+                        FOREIGN KEY (student_id) REFERENCES students (id),
+                        FOREIGN KEY (opportunity_id) REFERENCES opportunities (id)
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_recommendations_student_score
+                    ON recommendations (student_id, score DESC, opportunity_id)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_recommendations_opportunity
+                    ON recommendations (opportunity_id)
+                ''')
+                # Estudiantes cuya fila ya se calculó (aunque no tengan ninguna recomendación)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS recommendation_status (
+                        student_id INTEGER PRIMARY KEY,
+                        computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (student_id) REFERENCES students (id)
+                    )
+                ''')
+                
                 conn.commit()
-                print("✅ Base de datos inicializada correctamente")
+            
+            # Columnas e índices posteriores a la creación de las tablas (idx_opportunities_open, etc.)
+            MigrationRunner(self.db_path).run()
+            print("✅ Base de datos inicializada correctamente")
                 
         except Exception as e:
             print(f"❌ Error inicializando base de datos: {e}")
@@ -211,8 +739,7 @@ class DatabaseManager:
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
         """Ejecutar consulta y retornar resultados como lista de diccionarios"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
@@ -221,14 +748,70 @@ class DatabaseManager:
             print(f"Error ejecutando consulta: {e}")
             return []
     
+    def iter_query(self, query: str, params: tuple = (), batch_size: int = 500,
+                   row_format: str = 'dict') -> Iterator:
+        """Ejecutar consulta y recorrer los resultados leyéndolos de a batch_size filas
+        
+        row_format: 'dict' (como execute_query), 'tuple', 'record' (namedtuple por columnas) o
+        'columns' (por cada bloque, un dict columna -> lista de valores). La conexión del pool
+        queda tomada mientras se recorre: si se abandona antes del final hay que cerrar el
+        iterador (contextlib.closing). Con el journal de rollback la lectura abierta demora el
+        commit de los escritores, así que conviene consumirlo sin pausas largas.
+        
+        Un error antes de la primera fila se informa y no produce filas, como en execute_query;
+        uno posterior se propaga, para que quien recorre no tome un resultado parcial por completo.
+        """
+        if row_format not in ROW_FORMATS:
+            raise ValueError(f"Formato de fila desconocido: {row_format}")
+        
+        started = False
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    if row_format != 'dict':
+                        cursor.row_factory = None
+                    cursor.execute(query, params)
+                    columns = tuple(column[0] for column in cursor.description or ())
+                    record = record_type(columns) if row_format == 'record' else None
+                    
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            return
+                        started = True
+                        if row_format == 'dict':
+                            yield from (dict(row) for row in rows)
+                        elif row_format == 'tuple':
+                            yield from rows
+                        elif row_format == 'record':
+                            yield from map(record._make, rows)
+                        else:
+                            yield dict(zip(columns, map(list, zip(*rows))))
+                finally:
+                    cursor.close()
+        except Exception as e:
+            print(f"Error recorriendo consulta: {e}")
+            if started:
+                raise
+    
+    def _write(self, operations: List[tuple], result: str):
+        """Aplicar escrituras con commit, por la cola de escritura si está activa"""
+        self.ensure_checkpointer()
+        # Un hilo que ya tiene una conexión del pool (operación anidada) escribe con ella:
+        # esperar al escritor mientras se retiene un lock podría bloquear a ambos
+        if self.write_queue is not None and getattr(self.pool.local, 'connection', None) is None:
+            return self.write_queue.execute(operations, result)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            apply_operations(cursor, operations)
+            conn.commit()
+            return write_result(cursor, result)
+    
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Ejecutar consulta de actualización y retornar número de filas afectadas"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                conn.commit()
-                return cursor.rowcount
+            return self._write([(query, params)], 'rowcount')
         except Exception as e:
             print(f"Error ejecutando actualización: {e}")
             return 0
@@ -236,14 +819,56 @@ class DatabaseManager:
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """Ejecutar consulta de inserción y retornar ID del registro insertado"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                conn.commit()
-                return cursor.lastrowid
+            return self._write([(query, params)], 'lastrowid')
         except Exception as e:
             print(f"Error ejecutando inserción: {e}")
             return 0
+    
+    def execute_transaction(self, operations: List[tuple]) -> bool:
+        """Ejecutar varias sentencias en una sola transacción
+        
+        Cada operación es (query, params); si params es una lista se usa executemany.
+        """
+        try:
+            return self._write(operations, 'ok')
+        except Exception as e:
+            print(f"Error ejecutando transacción: {e}")
+            return False
+    
+    def ensure_checkpointer(self):
+        """Arrancar los checkpoints del WAL en este proceso; se llama antes de cada escritura"""
+        if self.checkpointer is not None:
+            self.checkpointer.ensure_running()
+    
+    def storage_stats(self) -> Dict:
+        """Perfil de almacenamiento, pool de conexiones y estado del WAL"""
+        return {
+            'profile': self.profile,
+            'pool': self.pool.stats(),
+            'wal': self.checkpointer.stats() if self.checkpointer is not None else None,
+            'write_queue': self.write_queue.stats() if self.write_queue is not None else None
+        }
+    
+    def close(self):
+        """Aplicar las escrituras pendientes, detener los checkpoints y cerrar las conexiones libres"""
+        if self.write_queue is not None:
+            self.write_queue.stop()
+        if self.checkpointer is not None:
+            self.checkpointer.stop()
+            self.checkpointer.checkpoint()
+        self.pool.close()
+    
+    def add_listener(self, callback):
+        """Registrar función a notificar cuando cambia un estudiante u oportunidad"""
+        self.listeners.append(callback)
+    
+    def notify_change(self, entity: str, entity_id: int):
+        """Notificar a los listeners que una entidad cambió"""
+        for callback in self.listeners:
+            try:
+                callback(entity, entity_id)
+            except Exception as e:
+                print(f"Error notificando cambio de {entity} {entity_id}: {e}")
 
 class User:
     """Modelo de Usuario usando SQLite nativo"""
@@ -361,7 +986,10 @@ class Student:
         params.append(student_id)
         
         query = f"UPDATE students SET {', '.join(set_clauses)} WHERE id = ?"
-        return self.db.execute_update(query, tuple(params)) > 0
+        updated = self.db.execute_update(query, tuple(params)) > 0
+        if updated:
+            self.db.notify_change('student', student_id)
+        return updated
     
     def get_skills_technical(self, student_data: Dict) -> List[str]:
         """Obtener habilidades técnicas"""
@@ -492,8 +1120,149 @@ class Company:
             'updated_at': company_data['updated_at']
         }
 
+class Opportunity:
+    """Modelo de Oportunidad usando SQLite nativo"""
+    
+    JSON_FIELDS = ['required_skills', 'required_careers', 'benefits']
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+    
+    def create(self, company_id: int, title: str, description: str, type: str, **kwargs) -> Optional[int]:
+        """Crear nueva oportunidad"""
+        query = '''
+            INSERT INTO opportunities (company_id, title, description, type, required_skills,
+                                     required_semester, required_careers, required_credits,
+                                     duration_months, hours_per_week, salary, benefits, location,
+                                     work_mode, available_positions, start_date, end_date,
+                                     application_deadline)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        params = (
+            company_id, title, description, type,
+            json.dumps(kwargs.get('required_skills', [])),
+            kwargs.get('required_semester'),
+            json.dumps(kwargs.get('required_careers', [])),
+            kwargs.get('required_credits', 0.0),
+            kwargs.get('duration_months'), kwargs.get('hours_per_week'), kwargs.get('salary'),
+            json.dumps(kwargs.get('benefits', [])),
+            kwargs.get('location'), kwargs.get('work_mode'),
+            kwargs.get('available_positions', 1),
+            kwargs.get('start_date'), kwargs.get('end_date'), kwargs.get('application_deadline')
+        )
+        opportunity_id = self.db.execute_insert(query, params)
+        if opportunity_id:
+            self.db.notify_change('opportunity', opportunity_id)
+        return opportunity_id
+    
+    def get_by_id(self, opportunity_id: int) -> Optional[Dict]:
+        """Obtener oportunidad por ID"""
+        query = 'SELECT * FROM opportunities WHERE id = ?'
+        results = self.db.execute_query(query, (opportunity_id,))
+        return results[0] if results else None
+    
+    def get_active(self) -> List[Dict]:
+        """Obtener oportunidades activas"""
+        return self.db.execute_query('SELECT * FROM opportunities WHERE is_active = 1')
+    
+    def update(self, opportunity_id: int, **kwargs) -> bool:
+        """Actualizar oportunidad"""
+        set_clauses = []
+        params = []
+        
+        for key, value in kwargs.items():
+            set_clauses.append(f"{key} = ?")
+            params.append(json.dumps(value) if key in self.JSON_FIELDS else value)
+        
+        if not set_clauses:
+            return False
+        
+        set_clauses.append("updated_at = CURRENT_TIMESTAMP")
+        params.append(opportunity_id)
+        
+        query = f"UPDATE opportunities SET {', '.join(set_clauses)} WHERE id = ?"
+        updated = self.db.execute_update(query, tuple(params)) > 0
+        if updated:
+            self.db.notify_change('opportunity', opportunity_id)
+        return updated
+    
+    def deactivate(self, opportunity_id: int) -> bool:
+        """Desactivar oportunidad"""
+        return self.update(opportunity_id, is_active=0)
+    
+    def get_required_skills(self, opportunity_data: Dict) -> List[str]:
+        """Obtener habilidades requeridas"""
+        return json.loads(opportunity_data['required_skills']) if opportunity_data['required_skills'] else []
+    
+    def get_required_careers(self, opportunity_data: Dict) -> List[str]:
+        """Obtener carreras requeridas"""
+        return json.loads(opportunity_data['required_careers']) if opportunity_data['required_careers'] else []
+    
+    def get_benefits(self, opportunity_data: Dict) -> List[str]:
+        """Obtener beneficios"""
+        return json.loads(opportunity_data['benefits']) if opportunity_data['benefits'] else []
+
+class Recommendation:
+    """Recomendaciones precalculadas (student_id, opportunity_id, score)"""
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+    
+    def replace_for_student(self, student_id: int, scores: List[tuple]) -> bool:
+        """Reemplazar las recomendaciones de un estudiante y marcarlo como calculado; scores es [(opportunity_id, score)]"""
+        return self.db.execute_transaction([
+            ('DELETE FROM recommendations WHERE student_id = ?', (student_id,)),
+            ('INSERT INTO recommendations (student_id, opportunity_id, score) VALUES (?, ?, ?)',
+             [(student_id, opportunity_id, score) for opportunity_id, score in scores]),
+            ('INSERT OR REPLACE INTO recommendation_status (student_id, computed_at) VALUES (?, CURRENT_TIMESTAMP)',
+             (student_id,))
+        ])
+    
+    def replace_for_opportunity(self, opportunity_id: int, scores: List[tuple]) -> bool:
+        """Reemplazar la columna de una oportunidad; scores es [(student_id, score)]"""
+        return self.db.execute_transaction([
+            ('DELETE FROM recommendations WHERE opportunity_id = ?', (opportunity_id,)),
+            ('INSERT INTO recommendations (student_id, opportunity_id, score) VALUES (?, ?, ?)',
+             [(student_id, opportunity_id, score) for student_id, score in scores])
+        ])
+    
+    def get_for_student(self, student_id: int, limit: int = 10) -> List[Dict]:
+        """Obtener las mejores recomendaciones de un estudiante (lectura por índice)
+        
+        Nada recalcula la tabla cuando vence application_deadline o se llenan las vacantes, así
+        que la elegibilidad de la oportunidad se vuelve a verificar al leer.
+        """
+        query = f'''
+            SELECT r.score, o.id, o.title, o.description, o.type, o.duration_months,
+                   o.hours_per_week, o.salary, o.location
+            FROM recommendations r
+            JOIN opportunities o ON o.id = r.opportunity_id
+            WHERE r.student_id = ? AND {OPEN_OPPORTUNITY_FILTER}
+            ORDER BY r.score DESC, r.opportunity_id
+            LIMIT ?
+        '''
+        return self.db.execute_query(query, (student_id, limit))
+    
+    def is_computed(self, student_id: int) -> bool:
+        """Indica si la fila del estudiante ya se calculó alguna vez"""
+        query = 'SELECT 1 FROM recommendation_status WHERE student_id = ?'
+        return bool(self.db.execute_query(query, (student_id,)))
+    
+    def count_for_student(self, student_id: int) -> int:
+        """Contar recomendaciones de un estudiante (solo oportunidades abiertas, como get_for_student)"""
+        query = f'''
+            SELECT COUNT(*) as count
+            FROM recommendations r
+            JOIN opportunities o ON o.id = r.opportunity_id
+            WHERE r.student_id = ? AND {OPEN_OPPORTUNITY_FILTER}
+        '''
+        results = self.db.execute_query(query, (student_id,))
+        return results[0]['count'] if results else 0
+
 # Instancia global de la base de datos
 db_manager = DatabaseManager()
 user_model = User(db_manager)
 student_model = Student(db_manager)
 company_model = Company(db_manager)
+opportunity_model = Opportunity(db_manager)
+recommendation_model = Recommendation(db_manager)
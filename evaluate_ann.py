@@ -0,0 +1,155 @@
+"""
+Evaluación del índice aproximado (LSH) contra el escaneo exacto de similitud semántica
+
+Mide recall@k de la lista corta del índice aproximado (re-ordenada de forma exacta) frente al
+top-k exacto sobre todo el catálogo, junto con el tamaño de la lista corta y la latencia. Ambas
+rutas parten del mismo vector TF-IDF del estudiante (transform_ms, común a las dos): exact_ms es
+el producto contra todo el catálogo y ann_ms la consulta (ann_query_ms) más el producto contra
+las filas de la lista corta (rerank_ms).
+
+Uso:
+    python evaluate_ann.py --opportunities 100000 --queries 200 --k 10
+    python evaluate_ann.py --db vinculacion_unrc.db
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import os
+import time
+
+import numpy as np
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ai_matching import AIMatchingEngine, CatalogIndex, RowRecord
+
+def load_from_database(db_path):
+    """Carga oportunidades activas y estudiantes desde la base de datos SQLite"""
+    with sqlite3.connect(db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        opportunities = [RowRecord(dict(row)) for row in conn.execute('SELECT * FROM opportunities WHERE is_active = 1')]
+        students = [RowRecord(dict(row)) for row in conn.execute('SELECT * FROM students')]
+    return opportunities, students
+
+def generate_synthetic(n_opportunities, n_students, seed=42):
+    """Genera un catálogo sintético por temas (cada tema con su propio vocabulario)"""
+    rng = random.Random(seed)
+    topics = [[f't{topic}w{word}' for word in range(40)] for topic in range(200)]
+    
+    opportunities = []
+    for opp_id in range(1, n_opportunities + 1):
+        words = rng.sample(rng.choice(topics), 8) + rng.sample(rng.choice(topics), 3)
+        opportunities.append(RowRecord({
+            'id': opp_id, 'description': ' '.join(words), 'type': 'internship', 'is_active': 1,
+            'required_skills': json.dumps(words[:2]), 'required_careers': '[]', 'benefits': '[]',
+            'required_semester': None, 'required_credits': None, 'duration_months': None,
+            'hours_per_week': None, 'salary': None
+        }))
+    
+    students = []
+    for student_id in range(1, n_students + 1):
+        students.append(RowRecord({
+            'id': student_id, 'skills_technical': json.dumps(rng.sample(rng.choice(topics), 5)),
+            'skills_soft': '[]', 'interests': json.dumps(rng.sample(rng.choice(topics), 2))
+        }))
+    return opportunities, students
+
+def mean_ms(seconds):
+    """Promedio en milisegundos (None si no hubo consultas)"""
+    return round(float(np.mean(seconds)) * 1000, 3) if seconds else None
+
+def evaluate(engine, opportunities, students, k, n_tables, n_bits):
+    """Calcula recall@k, tamaño de la lista corta y latencias"""
+    features, texts = [], []
+    for opportunity in opportunities:
+        opportunity_features, opportunity_text = engine.prepare_opportunity_features(opportunity)
+        features.append(opportunity_features)
+        texts.append(opportunity_text)
+    
+    index = CatalogIndex(opportunities, features, texts)
+    started = time.perf_counter()
+    index.build_ann(n_tables=n_tables, n_bits=n_bits)
+    build_seconds = time.perf_counter() - started
+    
+    matrix = index.semantic.matrix
+    recalls, shortlist_sizes = [], []
+    transform_times, exact_times, query_times, rerank_times = [], [], [], []
+    for student in students:
+        student_text = ' '.join(student.get_skills_technical() + student.get_skills_soft() + student.get_interests())
+        started = time.perf_counter()
+        student_vector = index.semantic.vectorizer.transform([student_text])
+        dense_vector = student_vector.toarray()[0]
+        transform_seconds = time.perf_counter() - started
+        if student_vector.nnz == 0:
+            continue
+        
+        # Escaneo exacto sobre todo el catálogo
+        started = time.perf_counter()
+        exact = matrix.dot(dense_vector)
+        relevant = np.flatnonzero(exact > 0)
+        exact_top = set(relevant[np.argsort(-exact[relevant], kind='stable')][:k].tolist())
+        exact_seconds = time.perf_counter() - started
+        if not exact_top:
+            continue
+        
+        # Lista corta aproximada re-ordenada de forma exacta
+        started = time.perf_counter()
+        shortlist = index.ann.query(student_vector)
+        query_seconds = time.perf_counter() - started
+        approximate = matrix[shortlist].dot(dense_vector)
+        ann_top = set(shortlist[np.argsort(-approximate, kind='stable')][:k].tolist())
+        rerank_times.append(time.perf_counter() - started - query_seconds)
+        
+        transform_times.append(transform_seconds)
+        exact_times.append(exact_seconds)
+        query_times.append(query_seconds)
+        recalls.append(len(exact_top & ann_top) / len(exact_top))
+        shortlist_sizes.append(len(shortlist))
+    
+    return {
+        'opportunities': len(opportunities),
+        'queries': len(recalls),
+        'k': k,
+        'tables': n_tables,
+        'bits': n_bits,
+        'build_seconds': round(build_seconds, 3),
+        'recall_at_k': round(float(np.mean(recalls)), 4) if recalls else None,
+        'mean_shortlist': round(float(np.mean(shortlist_sizes)), 1) if shortlist_sizes else None,
+        'shortlist_fraction': round(float(np.mean(shortlist_sizes)) / len(opportunities), 4) if shortlist_sizes else None,
+        'transform_ms': mean_ms(transform_times),
+        'exact_ms': mean_ms(exact_times),
+        'ann_query_ms': mean_ms(query_times),
+        'rerank_ms': mean_ms(rerank_times),
+        'ann_ms': mean_ms([query + rerank for query, rerank in zip(query_times, rerank_times)])
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Recall@k del índice aproximado contra el escaneo exacto')
+    parser.add_argument('--db', help='Base de datos SQLite con oportunidades y estudiantes reales')
+    parser.add_argument('--opportunities', type=int, default=100000, help='Oportunidades sintéticas')
+    parser.add_argument('--queries', type=int, default=200, help='Estudiantes usados como consultas')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--tables', type=int, default=16)
+    parser.add_argument('--bits', type=int, default=14)
+    args = parser.parse_args()
+    
+    if args.db:
+        opportunities, students = load_from_database(args.db)
+        students = students[:args.queries]
+    else:
+        opportunities, students = generate_synthetic(args.opportunities, args.queries)
+    
+    results = evaluate(AIMatchingEngine(), opportunities, students, args.k, args.tables, args.bits)
+    
+    print("=" * 60)
+    print("EVALUACIÓN DEL ÍNDICE APROXIMADO (LSH)")
+    print("=" * 60)
+    for key, value in results.items():
+        print(f"   {key}: {value}")
+
+if __name__ == '__main__':
+    main()
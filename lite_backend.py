@@ -0,0 +1,157 @@
+# Backend liviano de similitud de texto (solo NumPy)
+# Plataforma de Vinculación UNRC
+
+import re
+from collections import Counter
+
+import numpy as np
+
+# Mismo patrón de tokens y lista de stop words en inglés que TfidfVectorizer de sklearn,
+# para que ambos backends produzcan vocabularios equivalentes
+TOKEN_PATTERN = re.compile(r'(?u)\b\w\w+\b')
+ENGLISH_STOP_WORDS = frozenset([
+    'a', 'about', 'above', 'across', 'after', 'afterwards', 'again', 'against', 'all',
+    'almost', 'alone', 'along', 'already', 'also', 'although', 'always', 'am', 'among',
+    'amongst', 'amoungst', 'amount', 'an', 'and', 'another', 'any', 'anyhow', 'anyone',
+    'anything', 'anyway', 'anywhere', 'are', 'around', 'as', 'at', 'back', 'be', 'became',
+    'because', 'become', 'becomes', 'becoming', 'been', 'before', 'beforehand', 'behind',
+    'being', 'below', 'beside', 'besides', 'between', 'beyond', 'bill', 'both', 'bottom',
+    'but', 'by', 'call', 'can', 'cannot', 'cant', 'co', 'con', 'could', 'couldnt', 'cry',
+    'de', 'describe', 'detail', 'do', 'done', 'down', 'due', 'during', 'each', 'eg',
+    'eight', 'either', 'eleven', 'else', 'elsewhere', 'empty', 'enough', 'etc', 'even',
+    'ever', 'every', 'everyone', 'everything', 'everywhere', 'except', 'few', 'fifteen',
+    'fifty', 'fill', 'find', 'fire', 'first', 'five', 'for', 'former', 'formerly', 'forty',
+    'found', 'four', 'from', 'front', 'full', 'further', 'get', 'give', 'go', 'had', 'has',
+    'hasnt', 'have', 'he', 'hence', 'her', 'here', 'hereafter', 'hereby', 'herein',
+    'hereupon', 'hers', 'herself', 'him', 'himself', 'his', 'how', 'however', 'hundred',
+    'i', 'ie', 'if', 'in', 'inc', 'indeed', 'interest', 'into', 'is', 'it', 'its', 'itself',
+    'keep', 'last', 'latter', 'latterly', 'least', 'less', 'ltd', 'made', 'many', 'may',
+    'me', 'meanwhile', 'might', 'mill', 'mine', 'more', 'moreover', 'most', 'mostly',
+    'move', 'much', 'must', 'my', 'myself', 'name', 'namely', 'neither', 'never',
+    'nevertheless', 'next', 'nine', 'no', 'nobody', 'none', 'noone', 'nor', 'not',
+    'nothing', 'now', 'nowhere', 'of', 'off', 'often', 'on', 'once', 'one', 'only', 'onto',
+    'or', 'other', 'others', 'otherwise', 'our', 'ours', 'ourselves', 'out', 'over', 'own',
+    'part', 'per', 'perhaps', 'please', 'put', 'rather', 're', 'same', 'see', 'seem',
+    'seemed', 'seeming', 'seems', 'serious', 'several', 'she', 'should', 'show', 'side',
+    'since', 'sincere', 'six', 'sixty', 'so', 'some', 'somehow', 'someone', 'something',
+    'sometime', 'sometimes', 'somewhere', 'still', 'such', 'system', 'take', 'ten', 'than',
+    'that', 'the', 'their', 'them', 'themselves', 'then', 'thence', 'there', 'thereafter',
+    'thereby', 'therefore', 'therein', 'thereupon', 'these', 'they', 'thick', 'thin',
+    'third', 'this', 'those', 'though', 'three', 'through', 'throughout', 'thru', 'thus',
+    'to', 'together', 'too', 'top', 'toward', 'towards', 'twelve', 'twenty', 'two', 'un',
+    'under', 'until', 'up', 'upon', 'us', 'very', 'via', 'was', 'we', 'well', 'were',
+    'what', 'whatever', 'when', 'whence', 'whenever', 'where', 'whereafter', 'whereas',
+    'whereby', 'wherein', 'whereupon', 'wherever', 'whether', 'which', 'while', 'whither',
+    'who', 'whoever', 'whole', 'whom', 'whose', 'why', 'will', 'with', 'within', 'without',
+    'would', 'yet', 'you', 'your', 'yours', 'yourself', 'yourselves'
+])
+
+def tokenize(text):
+    """Tokens en minúsculas sin stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in ENGLISH_STOP_WORDS]
+
+class TfidfRows:
+    """Matriz TF-IDF dispersa por filas (CSR) sobre arreglos de NumPy"""
+
+    def __init__(self, indptr, indices, data, n_columns):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_columns = n_columns
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def shape(self):
+        return (len(self), self.n_columns)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def __getitem__(self, positions):
+        """Filas seleccionadas, en el orden dado"""
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self.indptr[positions]
+        lengths = self.indptr[positions + 1] - starts
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        take = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return TfidfRows(indptr, self.indices[take], self.data[take], self.n_columns)
+
+    def toarray(self):
+        dense = np.zeros(self.shape)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        dense[rows, self.indices] = self.data
+        return dense
+
+    def dot(self, other):
+        """Productos punto de cada fila de other contra todas las filas (forma len(other) x len(self))"""
+        queries = other.toarray()
+        rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        result = np.zeros((len(queries), len(self)))
+        for position, query in enumerate(queries):
+            result[position] = np.bincount(rows, weights=self.data * query[self.indices], minlength=len(self))
+        return result
+
+class LiteTfidfVectorizer:
+    """TF-IDF con idf suavizado y normalización L2, como TfidfVectorizer con sus valores por defecto"""
+
+    def __init__(self, max_features=1000):
+        self.max_features = max_features
+        self.vocabulary_ = {}
+        self.idf_ = None
+
+    def fit(self, texts):
+        documents = [tokenize(text) for text in texts]
+        document_frequency = Counter()
+        term_frequency = Counter()
+        for tokens in documents:
+            document_frequency.update(set(tokens))
+            term_frequency.update(tokens)
+
+        if not term_frequency:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+
+        terms = sorted(term_frequency)
+        if self.max_features is not None and len(terms) > self.max_features:
+            # Los términos más frecuentes del corpus, de nuevo en orden alfabético
+            frequencies = np.array([term_frequency[term] for term in terms])
+            keep = np.sort(np.argsort(-frequencies, kind='stable')[:self.max_features])
+            terms = [terms[position] for position in keep]
+
+        self.vocabulary_ = {term: column for column, term in enumerate(terms)}
+        df = np.array([document_frequency[term] for term in terms], dtype=np.float64)
+        self.idf_ = np.log((1 + len(documents)) / (1 + df)) + 1
+        return self
+
+    def transform(self, texts):
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            counts = Counter(token for token in tokenize(text) if token in self.vocabulary_)
+            columns = sorted(self.vocabulary_[token] for token in counts)
+            weights = np.array([counts[token] for token in sorted(counts, key=self.vocabulary_.get)],
+                               dtype=np.float64) * self.idf_[columns]
+
+            norm = np.sqrt(np.dot(weights, weights))
+            if norm > 0:
+                weights /= norm
+
+            indices.extend(columns)
+            data.extend(weights.tolist())
+            indptr.append(len(indices))
+
+        return TfidfRows(
+            np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64),
+            np.array(data, dtype=np.float64), len(self.vocabulary_)
+        )
+
+    def fit_transform(self, texts):
+        return self.fit(texts).transform(texts)
+
+def cosine(rows, first=0, second=1):
+    """Similitud coseno entre dos filas ya normalizadas"""
+    pair = rows[[first, second]].toarray()
+    return float(np.dot(pair[0], pair[1]))
@@ -0,0 +1,234 @@
+# Migraciones versionadas del esquema SQLite
+# Plataforma de Vinculación UNRC
+"""
+Migraciones del esquema registradas en la tabla schema_version
+
+Cada migración se aplica una sola vez, en orden y dentro de su propia transacción
+(BEGIN IMMEDIATE, así varios procesos que arrancan a la vez no la aplican dos veces). Todas
+son aditivas (columnas, índices, tablas y triggers nuevos), por lo que se pueden correr sobre
+bases en producción; tras aplicar alguna se ejecuta ANALYZE para que el planificador use los índices.
+
+Uso:
+    python migrations.py vinculacion_unrc.db --status
+    python migrations.py vinculacion_unrc.db --backup
+"""
+
+import argparse
+import sqlite3
+import sys
+from collections import namedtuple
+from typing import List
+
+Migration = namedtuple('Migration', ['version', 'description', 'steps'])
+
+# Columnas del esquema de DatabaseManager que faltan en bases creadas por versiones anteriores
+# (init_database de app_sqlite_native). ALTER TABLE no admite DEFAULT CURRENT_TIMESTAMP, así
+# que las fechas se agregan sin valor por defecto y se completan con backfill.
+MISSING_COLUMNS = {
+    'users': [('updated_at', 'TIMESTAMP')],
+    'students': [('birth_date', 'DATE'), ('cv_path', 'TEXT'), ('photo_path', 'TEXT'), ('updated_at', 'TIMESTAMP')],
+    'companies': [('size', 'TEXT'), ('website', 'TEXT'), ('contact_position', 'TEXT'), ('mission', 'TEXT'),
+                  ('vision', 'TEXT'), ('updated_at', 'TIMESTAMP')],
+    'opportunities': [('start_date', 'DATE'), ('end_date', 'DATE'), ('application_deadline', 'DATE'),
+                      ('updated_at', 'TIMESTAMP')],
+    'applications': [('additional_info', 'TEXT'), ('company_notes', 'TEXT'), ('admin_notes', 'TEXT'),
+                     ('responded_at', 'TIMESTAMP'), ('created_at', 'TIMESTAMP'), ('updated_at', 'TIMESTAMP')],
+}
+
+# Cambios de oportunidades que se conservan en catalog_changes (los triggers depuran los más
+# viejos); un proceso que quedó más atrás reconstruye su índice completo
+CATALOG_CHANGES_RETENTION = 10000
+
+def catalog_change_trigger(name: str, event: str, row: str) -> str:
+    """Trigger que registra en catalog_changes la oportunidad afectada por event"""
+    return f'''CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON opportunities
+               BEGIN
+                   INSERT INTO catalog_changes (opportunity_id) VALUES ({row}.id);
+                   DELETE FROM catalog_changes
+                   WHERE version <= (SELECT MAX(version) FROM catalog_changes) - {CATALOG_CHANGES_RETENTION};
+               END'''
+
+BACKFILL = {
+    ('applications', 'created_at'): 'UPDATE applications SET created_at = applied_at WHERE created_at IS NULL',
+    ('applications', 'updated_at'):
+        'UPDATE applications SET updated_at = COALESCE(reviewed_at, applied_at) WHERE updated_at IS NULL',
+}
+
+def table_columns(conn, table: str) -> List[str]:
+    """Columnas de una tabla (vacío si no existe)"""
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+
+def add_missing_columns(conn):
+    """Agrega las columnas faltantes y completa sus fechas"""
+    for table, columns in MISSING_COLUMNS.items():
+        existing = table_columns(conn, table)
+        if not existing:
+            continue
+        for column, column_type in columns:
+            if column in existing:
+                continue
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+            backfill = BACKFILL.get((table, column))
+            if backfill is None and column == 'updated_at':
+                backfill = f'UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL'
+            if backfill:
+                conn.execute(backfill)
+
+MIGRATIONS = [
+    Migration(1, 'Columnas del esquema actual en bases creadas por versiones anteriores', [add_missing_columns]),
+    Migration(2, 'Índices de claves foráneas y de estado', [
+        'CREATE INDEX IF NOT EXISTS idx_students_user_id ON students (user_id)',
+        'CREATE INDEX IF NOT EXISTS idx_companies_user_id ON companies (user_id)',
+        # company_id primero: sirve también para buscar solo por empresa
+        'CREATE INDEX IF NOT EXISTS idx_opportunities_company_active ON opportunities (company_id, is_active)',
+        'CREATE INDEX IF NOT EXISTS idx_applications_student_status ON applications (student_id, status)',
+        'CREATE INDEX IF NOT EXISTS idx_applications_opportunity_status ON applications (opportunity_id, status)',
+        'CREATE INDEX IF NOT EXISTS idx_applications_status ON applications (status)',
+        # Oportunidades abiertas; coincide con OPEN_OPPORTUNITY_FILTER de recommendations.py
+        '''CREATE INDEX IF NOT EXISTS idx_opportunities_open
+           ON opportunities (required_semester, required_credits, application_deadline)
+           WHERE is_active = 1 AND filled_positions < available_positions''',
+    ]),
+    Migration(3, 'Índices de cobertura para las consultas más frecuentes', [
+        # Dashboard: estudiantes por carrera sin leer la tabla
+        'CREATE INDEX IF NOT EXISTS idx_students_career ON students (career)',
+        # Entrenamiento incremental: postulaciones decididas en el orden de la marca de agua
+        '''CREATE INDEX IF NOT EXISTS idx_applications_decided
+           ON applications (COALESCE(responded_at, reviewed_at, updated_at, applied_at), id)
+           WHERE status IN ('accepted', 'rejected')''',
+    ]),
+    Migration(4, 'Quitar el índice simple de is_active', [
+        # La versión 2 lo creaba en bases ya migradas; el planificador lo prefería a
+        # idx_opportunities_open para la consulta de elegibilidad y lo dejaba sin uso
+        'DROP INDEX IF EXISTS idx_opportunities_is_active',
+    ]),
+    Migration(5, 'Registro de cambios del catálogo para los índices en memoria de cada proceso', [
+        # Cada worker sincroniza su SkillIndex leyendo los cambios posteriores a su versión
+        '''CREATE TABLE IF NOT EXISTS catalog_changes (
+               version INTEGER PRIMARY KEY AUTOINCREMENT,
+               opportunity_id INTEGER NOT NULL
+           )''',
+        catalog_change_trigger('trg_catalog_changes_insert', 'INSERT', 'NEW'),
+        # Solo las columnas que usa el índice de habilidades
+        catalog_change_trigger('trg_catalog_changes_update', 'UPDATE OF is_active, required_skills', 'NEW'),
+        catalog_change_trigger('trg_catalog_changes_delete', 'DELETE', 'OLD'),
+    ]),
+]
+
+class MigrationRunner:
+    """Aplica las migraciones pendientes de una base y las registra en schema_version"""
+
+    def __init__(self, db_path: str, migrations: List[Migration] = MIGRATIONS):
+        self.db_path = db_path
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Sin transacciones implícitas: cada migración controla la suya
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        return conn
+
+    @staticmethod
+    def _applied(conn) -> set:
+        return {row[0] for row in conn.execute('SELECT version FROM schema_version')}
+
+    def current_version(self) -> int:
+        """Versión más alta aplicada (0 si ninguna)"""
+        conn = self._connect()
+        try:
+            return max(self._applied(conn), default=0)
+        finally:
+            conn.close()
+
+    def pending(self) -> List[Migration]:
+        """Migraciones todavía no aplicadas"""
+        conn = self._connect()
+        try:
+            applied = self._applied(conn)
+        finally:
+            conn.close()
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    def backup(self, destination: str):
+        """Copia consistente de la base (API de backup de SQLite, sin detener a los demás)"""
+        source = sqlite3.connect(self.db_path, timeout=30)
+        target = sqlite3.connect(destination)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+    def run(self, backup: bool = False) -> List[int]:
+        """Aplica las migraciones pendientes; devuelve las versiones aplicadas"""
+        if backup and self.pending():
+            self.backup(f"{self.db_path}.v{self.current_version()}.bak")
+
+        conn = self._connect()
+        applied_now = []
+        try:
+            # Lectura sin lock: en el arranque normal no hay nada pendiente y no se toma el de escritura
+            applied = self._applied(conn)
+            for migration in self.migrations:
+                if migration.version in applied:
+                    continue
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    # Se vuelve a consultar con el lock tomado: otro proceso pudo aplicarla
+                    if migration.version in self._applied(conn):
+                        conn.execute('ROLLBACK')
+                        continue
+                    for step in migration.steps:
+                        if callable(step):
+                            step(conn)
+                        else:
+                            conn.execute(step)
+                    conn.execute(
+                        'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                        (migration.version, migration.description)
+                    )
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                applied_now.append(migration.version)
+                print(f"✅ Migración {migration.version} aplicada: {migration.description}")
+
+            if applied_now:
+                conn.execute('ANALYZE')
+            return applied_now
+        finally:
+            conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Migraciones del esquema SQLite')
+    parser.add_argument('db_path', nargs='?', default='vinculacion_unrc.db')
+    parser.add_argument('--status', action='store_true', help='Solo muestra la versión y las pendientes')
+    parser.add_argument('--backup', action='store_true', help='Copia la base antes de migrar')
+    args = parser.parse_args()
+
+    runner = MigrationRunner(args.db_path)
+    print("=" * 60)
+    print(f"MIGRACIONES DE {args.db_path} (versión {runner.current_version()})")
+    print("=" * 60)
+
+    if args.status:
+        for migration in runner.pending():
+            print(f"   pendiente {migration.version}: {migration.description}")
+        return
+
+    try:
+        applied = runner.run(backup=args.backup)
+    except sqlite3.Error as e:
+        print(f"❌ Error aplicando migraciones: {e}")
+        sys.exit(1)
+    print(f"Versión actual: {runner.current_version()} ({len(applied)} aplicadas)")
+
+if __name__ == '__main__':
+    main()
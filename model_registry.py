@@ -0,0 +1,122 @@
+# Registro versionado de modelos con publicación atómica
+# Plataforma de Vinculación UNRC
+
+import json
+import os
+import threading
+from datetime import datetime
+
+MANIFEST_NAME = 'manifest.json'
+
+def _atomic_write(path, write):
+    """Escribe en un archivo temporal del mismo directorio y lo publica con os.replace"""
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        write(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class ModelRegistry:
+    """Directorio de versiones del modelo con un manifiesto de la versión activa
+
+    Cada versión es un archivo inmutable <versión>.pkl (más <versión>.estimator.pkl si se
+    publica con un estimador aparte); el manifiesto guarda la versión activa, el historial de
+    activaciones (para rollback) y las métricas de cada versión.
+    """
+
+    def __init__(self, root='./models/registry'):
+        self.root = root
+        self.lock = threading.Lock()
+        self._manifest_cache = (None, None)  # ((inodo, mtime_ns), manifiesto)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.root, MANIFEST_NAME)
+
+    def manifest(self):
+        """Manifiesto actual; se relee solo cuando cambia el archivo"""
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return {'current': None, 'history': [], 'versions': {}}
+
+        # os.replace crea un inodo nuevo en cada publicación
+        key = (stat.st_ino, stat.st_mtime_ns)
+        cached_key, cached = self._manifest_cache
+        if cached_key != key:
+            with open(self.manifest_path) as f:
+                cached = json.load(f)
+            self._manifest_cache = (key, cached)
+        return cached
+
+    def current_version(self):
+        """Versión activa o None si el registro está vacío"""
+        return self.manifest().get('current')
+
+    def path_for(self, version):
+        """Ruta del artefacto de una versión"""
+        return os.path.join(self.root, self.manifest()['versions'][version]['file'])
+
+    def estimator_path_for(self, version):
+        """Ruta del estimador guardado aparte de una versión, o None si no tiene"""
+        file_name = self.manifest()['versions'][version].get('estimator_file')
+        return os.path.join(self.root, file_name) if file_name else None
+
+    def publish(self, model_data, metrics=None, estimator=None):
+        """Guarda una nueva versión y la marca como activa; devuelve su identificador
+
+        Si se da estimator se guarda en su propio archivo, para que cargar la versión no
+        obligue a deserializarlo.
+        """
+        import joblib
+
+        os.makedirs(self.root, exist_ok=True)
+        version = datetime.utcnow().strftime('v%Y%m%d%H%M%S%f')
+        file_name = f"{version}.pkl"
+        estimator_file = f"{version}.estimator.pkl" if estimator is not None else None
+
+        # Los artefactos quedan completos en disco antes de que el manifiesto los referencie. Sin
+        # compresión: joblib guarda los arreglos NumPy alineados y se pueden mapear con mmap
+        _atomic_write(os.path.join(self.root, file_name),
+                      lambda path: joblib.dump(model_data, path, compress=0))
+        if estimator_file:
+            _atomic_write(os.path.join(self.root, estimator_file),
+                          lambda path: joblib.dump(estimator, path, compress=0))
+
+        with self.lock:
+            manifest = json.loads(json.dumps(self.manifest()))
+            manifest['versions'][version] = {
+                'file': file_name,
+                'estimator_file': estimator_file,
+                'created_at': datetime.utcnow().isoformat(),
+                'metrics': metrics or {}
+            }
+            manifest['history'].append(version)
+            manifest['current'] = version
+            self._write_manifest(manifest)
+
+        return version
+
+    def rollback(self):
+        """Reactiva la versión anterior del historial; devuelve la versión activa o None"""
+        with self.lock:
+            manifest = json.loads(json.dumps(self.manifest()))
+            if len(manifest['history']) < 2:
+                return None
+
+            manifest['history'].pop()
+            manifest['current'] = manifest['history'][-1]
+            self._write_manifest(manifest)
+            return manifest['current']
+
+    def _write_manifest(self, manifest):
+        def write(path):
+            with open(path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+        _atomic_write(self.manifest_path, write)
+        self._manifest_cache = (None, None)
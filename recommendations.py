@@ -0,0 +1,450 @@
+# Recomendaciones precalculadas con actualización incremental
+# Plataforma de Vinculación UNRC
+
+import json
+import threading
+import time
+import unicodedata
+from bisect import insort, bisect_left
+from typing import Any, Callable, Hashable, Optional, Dict, Iterable, Set
+
+# Columnas que necesita el scorer; evita traer y convertir filas completas
+STUDENT_COLUMNS = 'id, semester, credits_percentage, career, skills_technical, skills_soft'
+OPPORTUNITY_COLUMNS = 'id, required_skills, required_semester, required_credits'
+
+# Oportunidades abiertas; coincide con el índice parcial idx_opportunities_open
+OPEN_OPPORTUNITY_FILTER = '''is_active = 1 AND filled_positions < available_positions
+              AND (application_deadline IS NULL OR application_deadline >= DATE('now'))'''
+
+def basic_match_score(student: Dict, opportunity: Dict) -> Optional[float]:
+    """Score básico de compatibilidad; None si el estudiante no cumple los requisitos"""
+    # Verificar requisitos básicos
+    if opportunity['required_semester'] and student['semester'] < opportunity['required_semester']:
+        return None
+    if opportunity['required_credits'] and student['credits_percentage'] < opportunity['required_credits']:
+        return None
+    
+    # Calcular score de compatibilidad básico
+    match_score = 0.5  # Score básico
+    
+    # Ajustar score según habilidades
+    if opportunity['required_skills']:
+        required_skills = json.loads(opportunity['required_skills'])
+        student_skills = json.loads(student['skills_technical']) if student['skills_technical'] else []
+        common_skills = set(student_skills).intersection(set(required_skills))
+        if required_skills:
+            match_score += len(common_skills) / len(required_skills) * 0.3
+    
+    return round(match_score, 2)
+
+def canonical_skill(skill: str) -> str:
+    """Forma canónica de una habilidad: sin acentos, minúsculas y espacios normalizados"""
+    normalized = unicodedata.normalize('NFKD', str(skill))
+    normalized = ''.join(char for char in normalized if not unicodedata.combining(char))
+    return ' '.join(normalized.casefold().split())
+
+class SkillIndex:
+    """Índice invertido habilidad canónica -> ids de oportunidades
+    
+    Permite descartar antes de puntuar las oportunidades que no comparten ninguna habilidad
+    con el estudiante. El conjunto de exploración (oportunidades sin habilidades requeridas y
+    las exploration_size más recientes) siempre se incluye entre los candidatos. Las
+    oportunidades que entran o salen de la ventana de recientes al agregar o quitar otra se
+    acumulan en window_changes, porque su columna de recomendaciones también cambia.
+    
+    El índice vive en la memoria de cada proceso; load() lo deja sincronizado con el registro
+    catalog_changes de SQLite para que vea también los cambios hechos por otros workers.
+    """
+    
+    def __init__(self, exploration_size: int = 20):
+        self.exploration_size = exploration_size
+        self.postings = {}
+        self.skills_by_id = {}
+        self.without_skills = set()
+        self.ordered_ids = []
+        self.window_changes = set()
+        self.catalog_version = 0  # Último cambio de catalog_changes aplicado
+        self.lock = threading.RLock()
+    
+    def __len__(self):
+        return len(self.skills_by_id)
+    
+    def exploration_window(self) -> Set[int]:
+        """Las exploration_size oportunidades más recientes"""
+        if self.exploration_size <= 0:
+            return set()
+        return set(self.ordered_ids[-self.exploration_size:])
+    
+    def pop_window_changes(self) -> Set[int]:
+        """Oportunidades que entraron o salieron de la ventana desde la última llamada"""
+        changes, self.window_changes = self.window_changes, set()
+        return changes
+    
+    def add(self, opportunity_id: int, skills: Iterable[str]):
+        """Agregar o reemplazar las habilidades de una oportunidad"""
+        window = self.exploration_window()
+        self.remove(opportunity_id)
+        
+        canonical = frozenset(canonical_skill(skill) for skill in skills if skill)
+        self.skills_by_id[opportunity_id] = canonical
+        insort(self.ordered_ids, opportunity_id)
+        
+        if not canonical:
+            self.without_skills.add(opportunity_id)
+        for skill in canonical:
+            self.postings.setdefault(skill, set()).add(opportunity_id)
+        self.window_changes.update(window ^ self.exploration_window())
+    
+    def remove(self, opportunity_id: int):
+        """Quitar una oportunidad del índice"""
+        canonical = self.skills_by_id.pop(opportunity_id, None)
+        if canonical is None:
+            return
+        
+        window = self.exploration_window()
+        del self.ordered_ids[bisect_left(self.ordered_ids, opportunity_id)]
+        self.window_changes.update(window ^ self.exploration_window())
+        self.without_skills.discard(opportunity_id)
+        for skill in canonical:
+            ids = self.postings.get(skill)
+            if ids is not None:
+                ids.discard(opportunity_id)
+                if not ids:
+                    del self.postings[skill]
+    
+    def candidates(self, skills: Iterable[str]) -> Set[int]:
+        """Oportunidades que comparten al menos una habilidad, más el conjunto de exploración"""
+        with self.lock:
+            candidates = set(self.without_skills)
+            if self.exploration_size > 0:
+                candidates.update(self.ordered_ids[-self.exploration_size:])
+            
+            for skill in skills:
+                candidates.update(self.postings.get(canonical_skill(skill), ()))
+        
+        return candidates
+    
+    def is_candidate(self, opportunity_id: int, skills: Iterable[str]) -> bool:
+        """Indica si una oportunidad sería candidata para las habilidades dadas"""
+        with self.lock:
+            if opportunity_id in self.without_skills:
+                return True
+            if self.exploration_size > 0 and opportunity_id in self.ordered_ids[-self.exploration_size:]:
+                return True
+            
+            opportunity_skills = self.skills_by_id.get(opportunity_id, frozenset())
+        return any(canonical_skill(skill) in opportunity_skills for skill in skills)
+    
+    def load(self, db_manager):
+        """Construir el índice con las oportunidades activas y mantenerlo al día ante cambios"""
+        with self.lock:
+            self._rebuild(db_manager)
+            self.window_changes.clear()
+        
+        db_manager.add_listener(lambda entity, entity_id: self._on_change(db_manager, entity, entity_id))
+        return self
+    
+    def sync(self, db_manager) -> bool:
+        """Aplicar los cambios registrados en catalog_changes desde la última sincronización
+        
+        Los triggers de SQLite llenan el registro, así que incluye los cambios de otros procesos
+        y los que no pasaron por notify_change. Si los triggers ya depuraron cambios que este
+        índice no aplicó, se reconstruye completo. Devuelve True si hubo cambios.
+        """
+        with self.lock:
+            rows = db_manager.execute_query(
+                'SELECT version, opportunity_id FROM catalog_changes WHERE version > ? ORDER BY version',
+                (self.catalog_version,)
+            )
+            if not rows:
+                return False
+            
+            if rows[0]['version'] > self.catalog_version + 1:
+                self._rebuild(db_manager)
+                return True
+            
+            for opportunity_id in dict.fromkeys(row['opportunity_id'] for row in rows):
+                self._apply(db_manager, opportunity_id)
+            self.catalog_version = rows[-1]['version']
+            return True
+    
+    def _rebuild(self, db_manager):
+        """Volver a leer todas las oportunidades activas"""
+        window = self.exploration_window()
+        # La versión se lee antes que las filas: un cambio concurrente se vuelve a aplicar, no se pierde
+        versions = db_manager.execute_query('SELECT MAX(version) AS version FROM catalog_changes')
+        self.catalog_version = (versions[0]['version'] if versions else None) or 0
+        
+        pending = self.window_changes
+        self.postings, self.skills_by_id, self.without_skills, self.ordered_ids = {}, {}, set(), []
+        rows = db_manager.iter_query('SELECT id, required_skills FROM opportunities WHERE is_active = 1',
+                                     row_format='tuple')
+        for opportunity_id, required_skills in rows:
+            self.add(opportunity_id, json.loads(required_skills) if required_skills else [])
+        self.window_changes = pending | (window ^ self.exploration_window())
+    
+    def _apply(self, db_manager, opportunity_id: int):
+        """Volver a leer una oportunidad y agregarla o quitarla del índice"""
+        rows = db_manager.execute_query(
+            'SELECT id, required_skills, is_active FROM opportunities WHERE id = ?', (opportunity_id,)
+        )
+        if rows and rows[0]['is_active']:
+            row = rows[0]
+            self.add(row['id'], json.loads(row['required_skills']) if row['required_skills'] else [])
+        else:
+            self.remove(opportunity_id)
+    
+    def _on_change(self, db_manager, entity: str, opportunity_id: int):
+        if entity != 'opportunity':
+            return
+        
+        # Sin cambios registrados (p. ej. solo cambió el título) se relee la oportunidad notificada
+        with self.lock:
+            if not self.sync(db_manager):
+                self._apply(db_manager, opportunity_id)
+
+def student_skills(student: Dict) -> list:
+    """Habilidades técnicas y blandas de una fila de estudiante"""
+    skills = []
+    for field in ('skills_technical', 'skills_soft'):
+        if student.get(field):
+            skills.extend(json.loads(student[field]))
+    return skills
+
+class RecommendationRefresher:
+    """Mantiene la tabla de recomendaciones recalculando solo lo que cambió
+    
+    Al cambiar un estudiante se recalcula su fila; al crear, editar o desactivar una
+    oportunidad se recalcula solo su columna. Con un SkillIndex solo se puntúan las
+    oportunidades candidatas de cada estudiante.
+    """
+    
+    def __init__(self, db_manager, recommendation_model, scorer=basic_match_score, min_score: float = 0.3,
+                 skill_index: Optional[SkillIndex] = None):
+        self.db = db_manager
+        self.recommendations = recommendation_model
+        self.scorer = scorer
+        self.min_score = min_score
+        self.skill_index = skill_index
+        # Cambian cuando el resultado de cualquier estudiante puede cambiar; forman parte de las
+        # claves de caché de las recomendaciones
+        self.catalog_version = 0
+        self.model_version = getattr(scorer, 'version', scorer.__name__)
+        db_manager.add_listener(self.on_change)
+    
+    def on_change(self, entity: str, entity_id: int):
+        """Listener de cambios del DatabaseManager"""
+        if entity == 'student':
+            self.refresh_student(entity_id)
+        elif entity == 'opportunity':
+            # Las que entraron o salieron de la ventana de exploración cambian de candidatos; se
+            # toman antes de recalcular para no mezclarlas con las que sync() trae de otros procesos
+            window_changes = self.skill_index.pop_window_changes() if self.skill_index is not None else set()
+            self.refresh_opportunity(entity_id)
+            for opportunity_id in window_changes - {entity_id}:
+                self.refresh_opportunity(opportunity_id)
+            # Después de actualizar la tabla, para no cachear una lectura a medio actualizar
+            self.catalog_version += 1
+    
+    def sync(self) -> bool:
+        """Poner al día el índice de habilidades con los cambios de catálogo de otros procesos
+        
+        Las columnas de esos cambios ya las recalculó el proceso que los notificó, así que aquí
+        solo se actualiza el índice y se cambia catalog_version (invalida las cachés locales).
+        """
+        if self.skill_index is None or not self.skill_index.sync(self.db):
+            return False
+        self.skill_index.pop_window_changes()
+        self.catalog_version += 1
+        return True
+    
+    def refresh_student(self, student_id: int) -> bool:
+        """Recalcular las recomendaciones de un estudiante contra el catálogo activo"""
+        self.sync()
+        students = self.db.execute_query(
+            f'SELECT {STUDENT_COLUMNS} FROM students WHERE id = ?', (student_id,)
+        )
+        if not students:
+            return self.recommendations.replace_for_student(student_id, [])
+        
+        student = students[0]
+        if self.skill_index is None:
+            opportunities = self._eligible_opportunities(student)
+        else:
+            opportunities = self._eligible_opportunities(
+                student, self.skill_index.candidates(student_skills(student))
+            )
+        
+        scores = []
+        for opportunity in opportunities:
+            score = self.scorer(student, opportunity)
+            if score is not None and score >= self.min_score:
+                scores.append((opportunity['id'], score))
+        
+        return self.recommendations.replace_for_student(student_id, scores)
+    
+    def refresh_opportunity(self, opportunity_id: int) -> bool:
+        """Recalcular la columna de una oportunidad contra todos los estudiantes"""
+        self.sync()
+        opportunities = self.db.execute_query(f'''
+            SELECT {OPPORTUNITY_COLUMNS}, required_careers
+            FROM opportunities
+            WHERE id = ? AND {OPEN_OPPORTUNITY_FILTER}
+        ''', (opportunity_id,))
+        if not opportunities:
+            # Oportunidad eliminada, desactivada, cerrada o sin vacantes: se retira de todas las recomendaciones
+            return self.recommendations.replace_for_opportunity(opportunity_id, [])
+        
+        opportunity = opportunities[0]
+        students = self._eligible_students(opportunity)
+        
+        scores = []
+        for student in students:
+            if self.skill_index is not None and not self.skill_index.is_candidate(
+                opportunity_id, student_skills(student)
+            ):
+                continue
+            score = self.scorer(student, opportunity)
+            if score is not None and score >= self.min_score:
+                scores.append((student['id'], score))
+        
+        return self.recommendations.replace_for_opportunity(opportunity_id, scores)
+    
+    def _eligible_opportunities(self, student: Dict, opportunity_ids: Optional[Set[int]] = None,
+                                chunk_size: int = 500) -> list:
+        """Oportunidades abiertas para las que el estudiante cumple los requisitos, filtradas en SQLite"""
+        query = f'''
+            SELECT {OPPORTUNITY_COLUMNS}
+            FROM opportunities
+            WHERE {OPEN_OPPORTUNITY_FILTER}
+              AND (required_semester IS NULL OR required_semester <= ?)
+              AND (required_credits IS NULL OR required_credits <= ?)
+              AND (required_careers IS NULL OR required_careers IN ('', '[]')
+                   OR EXISTS (SELECT 1 FROM json_each(opportunities.required_careers) WHERE value = ?))
+        '''
+        params = (student['semester'], student['credits_percentage'] or 0, student['career'])
+        
+        if opportunity_ids is None:
+            return self.db.execute_query(query, params)
+        
+        # Solo los candidatos del índice de habilidades, en bloques de parámetros
+        ids = sorted(opportunity_ids)
+        opportunities = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            opportunities.extend(self.db.execute_query(
+                f'{query} AND id IN ({placeholders})', params + tuple(chunk)
+            ))
+        return opportunities
+    
+    def _eligible_students(self, opportunity: Dict) -> Iterable[Dict]:
+        """Estudiantes que cumplen semestre, créditos y carrera de una oportunidad, filtrados en SQLite
+        
+        Se recorren por bloques en lugar de cargar toda la tabla de estudiantes.
+        """
+        query = f'''
+            SELECT {STUDENT_COLUMNS}
+            FROM students
+            WHERE semester >= ? AND credits_percentage >= ?
+        '''
+        params = (opportunity['required_semester'] or 0, opportunity['required_credits'] or 0)
+        
+        careers = json.loads(opportunity['required_careers']) if opportunity['required_careers'] else []
+        if careers:
+            query += f" AND career IN ({', '.join('?' * len(careers))})"
+            params += tuple(careers)
+        
+        return self.db.iter_query(query, params)
+
+class _Flight:
+    """Cálculo en curso de una clave; los demás solicitantes esperan su resultado"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Agrupa los cálculos concurrentes de una misma clave y cachea el resultado unos segundos
+    
+    La primera solicitud de una clave calcula; las que llegan mientras tanto esperan ese mismo
+    cálculo y las siguientes, hasta ttl segundos, reciben el resultado cacheado. Los errores no
+    se cachean: se propagan a quienes esperaban y la siguiente solicitud vuelve a calcular.
+    """
+    
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.results = {}  # clave -> (vence, resultado)
+        self.in_flight = {}  # clave -> _Flight
+        self.metrics = {'computations': 0, 'cache_hits': 0, 'coalesced': 0, 'errors': 0}
+    
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Resultado de compute() para la clave, calculado como máximo una vez a la vez"""
+        now = time.monotonic()
+        with self.lock:
+            cached = self.results.get(key)
+            if cached is not None and cached[0] > now:
+                self.metrics['cache_hits'] += 1
+                return cached[1]
+            
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[key] = _Flight()
+                self.metrics['computations'] += 1
+            else:
+                self.metrics['coalesced'] += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        
+        try:
+            flight.result = compute()
+        except Exception as e:
+            flight.error = e
+            with self.lock:
+                self.metrics['errors'] += 1
+            raise
+        finally:
+            with self.lock:
+                # Si la clave se invalidó durante el cálculo, el resultado no se cachea
+                if self.in_flight.get(key) is flight:
+                    del self.in_flight[key]
+                    if flight.error is None:
+                        self._store(key, flight.result)
+            flight.done.set()
+        return flight.result
+    
+    def invalidate(self, predicate: Callable[[Hashable], bool]):
+        """Descartar los resultados (cacheados o en curso) de las claves que cumplen predicate"""
+        with self.lock:
+            for key in [key for key in self.results if predicate(key)]:
+                del self.results[key]
+            for key in [key for key in self.in_flight if predicate(key)]:
+                del self.in_flight[key]
+    
+    def stats(self) -> Dict:
+        """Contadores de cálculos y de cálculos ahorrados (aciertos de caché + esperas agrupadas)"""
+        with self.lock:
+            stats = dict(self.metrics)
+            stats['saved'] = stats['cache_hits'] + stats['coalesced']
+            stats['in_flight'] = len(self.in_flight)
+            stats['cached'] = len(self.results)
+        requests = stats['computations'] + stats['saved']
+        stats['saved_ratio'] = round(stats['saved'] / requests, 3) if requests else 0.0
+        return stats
+    
+    def _store(self, key: Hashable, result: Any):
+        now = time.monotonic()
+        if len(self.results) >= self.max_entries:
+            # Primero se descartan los vencidos (p. ej. de versiones de catálogo anteriores)
+            self.results = {k: v for k, v in self.results.items() if v[0] > now}
+            while len(self.results) >= self.max_entries:
+                del self.results[next(iter(self.results))]
+        self.results[key] = (now + self.ttl, result)
@@ -0,0 +1,448 @@
+# Servicio de scoring fuera de proceso sobre un socket Unix
+# Plataforma de Vinculación UNRC
+"""
+Demonio opcional que aloja AIMatchingEngine en un pool de procesos
+
+El matching es intensivo en CPU; puntuar dentro del hilo de Flask bloquea al resto de los
+endpoints detrás del GIL. El demonio recibe lotes de estudiantes por un socket Unix local y
+los puntúa en procesos aparte; Flask usa ScoringClient, que reutiliza conexiones, aplica un
+timeout y, si el demonio no responde, puntúa en proceso como antes.
+
+Protocolo: cada mensaje es una cabecera de 5 bytes (tipo, longitud del cuerpo) seguida del
+cuerpo. El catálogo se identifica por un hash de sus (id, updated_at) y solo se envía cuando
+el demonio no lo tiene; los resultados vuelven como arreglos binarios de ids y scores.
+
+Uso:
+    python scoring_service.py --socket /tmp/vinculacion_scoring.sock --workers 4
+    python scoring_service.py --socket /tmp/vinculacion_scoring.sock --stats
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+
+from ai_matching import (
+    AIMatchingEngine, RowRecord, make_vectorizer, STUDENT_FEATURE_COLUMNS, OPPORTUNITY_FEATURE_COLUMNS
+)
+
+DEFAULT_SOCKET_PATH = os.getenv('SCORING_SOCKET', '/tmp/vinculacion_scoring.sock')
+
+# Cabecera de cada mensaje: tipo (1 byte) y longitud del cuerpo (4 bytes, big-endian)
+FRAME_HEADER = struct.Struct('!BI')
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+MSG_SCORE = 1
+MSG_STATS = 2
+MSG_RESULT = 0x81
+MSG_STATS_RESULT = 0x82
+MSG_CATALOG_MISSING = 0x83
+MSG_ERROR = 0xFF
+
+# Cuerpo de MSG_SCORE: clave del catálogo, top_n, longitudes del catálogo y de los estudiantes
+SCORE_HEADER = struct.Struct('!16sHII')
+
+CATALOG_COLUMNS = OPPORTUNITY_FEATURE_COLUMNS + ['is_active', 'updated_at']
+
+class ProtocolError(Exception):
+    """Mensaje mal formado o inesperado"""
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError('conexión cerrada por el otro extremo')
+        received += count
+    return bytes(buffer)
+
+def send_frame(sock, message_type, body=b''):
+    """Envía un mensaje con su cabecera"""
+    sock.sendall(FRAME_HEADER.pack(message_type, len(body)) + body)
+
+def recv_frame(sock):
+    """Recibe un mensaje; devuelve (tipo, cuerpo)"""
+    message_type, size = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ProtocolError(f'mensaje de {size} bytes supera el máximo')
+    return message_type, _recv_exact(sock, size) if size else b''
+
+def encode_results(results):
+    """[[(opp_id, score), ...], ...] -> cantidades, ids y scores como arreglos binarios"""
+    counts = [len(items) for items in results]
+    ids = [opportunity_id for items in results for opportunity_id, _ in items]
+    scores = [score for items in results for _, score in items]
+    return (struct.pack(f'!I{len(counts)}H', len(counts), *counts)
+            + struct.pack(f'!{len(ids)}I', *ids)
+            + struct.pack(f'!{len(scores)}d', *scores))
+
+def decode_results(body):
+    """Inverso de encode_results"""
+    (n_students,) = struct.unpack_from('!I', body)
+    counts = struct.unpack_from(f'!{n_students}H', body, 4)
+    total = sum(counts)
+    offset = 4 + 2 * n_students
+    ids = struct.unpack_from(f'!{total}I', body, offset)
+    scores = struct.unpack_from(f'!{total}d', body, offset + 4 * total)
+
+    results, start = [], 0
+    for count in counts:
+        results.append(list(zip(ids[start:start + count], scores[start:start + count])))
+        start += count
+    return results
+
+def _jsonable(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+def serialize_rows(records, columns):
+    """Modelos ORM o RowRecord -> JSON con las columnas que usa el motor"""
+    return json.dumps([
+        {column: _jsonable(getattr(record, column, None)) for column in columns} for record in records
+    ]).encode('utf-8')
+
+# --- Lado de los workers (un motor por proceso) ---
+
+WORKER_CATALOG_CACHE = 4
+
+_worker_engine = None
+_worker_catalogs = OrderedDict()
+
+def _init_worker(backend):
+    global _worker_engine
+    _worker_engine = AIMatchingEngine(backend=backend)
+    _worker_engine.load_model()
+    # Pagar la importación de sklearn al arrancar y no en la primera solicitud
+    make_vectorizer(_worker_engine.backend)
+
+def _ping():
+    return os.getpid()
+
+def _score_task(catalog_key, catalog_payload, students_payload, top_n):
+    """Top-N de cada estudiante del lote contra el catálogo; devuelve [(opp_id, score), ...] por estudiante"""
+    _worker_engine.check_for_model_update()
+
+    # Se reutiliza la misma lista para que el motor reutilice su índice del catálogo
+    opportunities = _worker_catalogs.get(catalog_key)
+    if opportunities is None:
+        opportunities = [RowRecord(row) for row in json.loads(catalog_payload)]
+        _worker_catalogs[catalog_key] = opportunities
+        while len(_worker_catalogs) > WORKER_CATALOG_CACHE:
+            _worker_catalogs.popitem(last=False)
+    else:
+        _worker_catalogs.move_to_end(catalog_key)
+
+    results = []
+    for row in json.loads(students_payload):
+        recommendations = _worker_engine.get_top_recommendations(RowRecord(row), opportunities, top_n)
+        results.append([(item['opportunity'].id, item['score']) for item in recommendations])
+    return results
+
+# --- Demonio ---
+
+class ScoringRequestHandler(socketserver.BaseRequestHandler):
+    """Atiende los mensajes de una conexión hasta que el cliente la cierra"""
+
+    def handle(self):
+        while True:
+            try:
+                message_type, body = recv_frame(self.request)
+            except (ConnectionError, ProtocolError, OSError):
+                return
+
+            if message_type == MSG_STATS:
+                send_frame(self.request, MSG_STATS_RESULT, json.dumps(self.server.stats()).encode('utf-8'))
+            elif message_type == MSG_SCORE:
+                response_type, response = self.server.score(body)
+                send_frame(self.request, response_type, response)
+            else:
+                send_frame(self.request, MSG_ERROR, f'tipo de mensaje desconocido: {message_type}'.encode('utf-8'))
+
+class ScoringServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor del socket Unix; reparte los lotes entre un pool de procesos con un motor cada uno"""
+
+    daemon_threads = True
+    max_catalogs = 8
+    latency_window = 1000
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, workers=None, backend=None):
+        self.socket_path = socket_path
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.catalogs = OrderedDict()  # clave -> catálogo serializado
+        self.catalog_lock = threading.Lock()
+
+        self.stats_lock = threading.Lock()
+        self.queue_depth = 0
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=self.latency_window)
+        self.started_at = time.time()
+
+        self._start_pool()
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, ScoringRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def _start_pool(self):
+        # spawn: los workers no heredan hilos ni locks del servidor
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(self.backend,)
+        )
+        # Levantar todos los workers antes de aceptar conexiones
+        for future in [self.pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+
+    def score(self, body):
+        """Procesa un MSG_SCORE; devuelve (tipo, cuerpo) de la respuesta"""
+        started = time.perf_counter()
+        with self.stats_lock:
+            self.queue_depth += 1
+            self.requests += 1
+        try:
+            catalog_key, top_n, catalog_size, students_size = SCORE_HEADER.unpack_from(body)
+            offset = SCORE_HEADER.size
+            catalog_payload = body[offset:offset + catalog_size]
+            students_payload = body[offset + catalog_size:offset + catalog_size + students_size]
+
+            with self.catalog_lock:
+                if catalog_payload:
+                    self.catalogs[catalog_key] = catalog_payload
+                    while len(self.catalogs) > self.max_catalogs:
+                        self.catalogs.popitem(last=False)
+                catalog_payload = self.catalogs.get(catalog_key)
+                if catalog_payload is not None:
+                    self.catalogs.move_to_end(catalog_key)
+            if catalog_payload is None:
+                return MSG_CATALOG_MISSING, b''
+
+            pool = self.pool
+            try:
+                results = pool.submit(_score_task, catalog_key, catalog_payload, students_payload, top_n).result()
+            except BrokenProcessPool:
+                # Un worker murió: se reemplaza el pool y se reintenta una vez
+                with self.pool_lock:
+                    if self.pool is pool:
+                        self._start_pool()
+                results = self.pool.submit(
+                    _score_task, catalog_key, catalog_payload, students_payload, top_n
+                ).result()
+            return MSG_RESULT, encode_results(results)
+
+        except Exception as e:
+            print(f"Error puntuando lote: {e}")
+            with self.stats_lock:
+                self.errors += 1
+            return MSG_ERROR, str(e).encode('utf-8')
+        finally:
+            with self.stats_lock:
+                self.queue_depth -= 1
+                self.latencies.append((time.perf_counter() - started) * 1000)
+
+    def stats(self):
+        """Profundidad de la cola y latencia por solicitud (ms) de las últimas solicitudes"""
+        with self.stats_lock:
+            latencies = sorted(self.latencies)
+            stats = {
+                'queue_depth': self.queue_depth,
+                'workers': self.workers,
+                'requests': self.requests,
+                'errors': self.errors,
+                'uptime_seconds': round(time.time() - self.started_at, 1)
+            }
+        if latencies:
+            def percentile(p):
+                return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 3)
+            stats['latency_ms'] = {
+                'p50': percentile(50), 'p95': percentile(95), 'p99': percentile(99), 'max': round(latencies[-1], 3)
+            }
+        with self.catalog_lock:
+            stats['catalogs'] = len(self.catalogs)
+        return stats
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+# --- Cliente (lado de Flask) ---
+
+class ScoringClient:
+    """Cliente del demonio de scoring con conexiones reutilizables y respaldo en proceso
+
+    Expone get_top_recommendations con el mismo resultado que AIMatchingEngine. Si no hay
+    socket configurado, o el demonio falla o no responde a tiempo, puntúa con fallback_engine
+    y no vuelve a intentar el demonio hasta pasados retry_interval segundos.
+    """
+
+    def __init__(self, socket_path=None, fallback_engine=None, timeout=2.0, pool_size=4, retry_interval=5.0):
+        self.socket_path = socket_path
+        self.fallback_engine = fallback_engine
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self._connections = queue.LifoQueue(maxsize=pool_size)
+        self._known_catalogs = set()
+        self._catalog_cache = (None, None, None)  # (firma, clave, catálogo serializado)
+        self._unavailable_until = 0.0
+        self._stats_lock = threading.Lock()
+        self.stats = {'remote': 0, 'fallback': 0, 'errors': 0}
+
+    @classmethod
+    def from_env(cls, fallback_engine):
+        """Cliente configurado con SCORING_SOCKET y SCORING_TIMEOUT; sin socket puntúa en proceso"""
+        return cls(
+            socket_path=os.getenv('SCORING_SOCKET'),
+            fallback_engine=fallback_engine,
+            timeout=float(os.getenv('SCORING_TIMEOUT', 2.0))
+        )
+
+    def get_top_recommendations(self, student, opportunities, top_n=10):
+        """Mejores recomendaciones para un estudiante"""
+        return self.recommend_batch([student], opportunities, top_n)[0]
+
+    def recommend_batch(self, students, opportunities, top_n=10):
+        """Mejores recomendaciones para cada estudiante del lote, en una sola solicitud al demonio"""
+        students = list(students)
+        opportunities = list(opportunities)
+
+        if self.socket_path and time.monotonic() >= self._unavailable_until:
+            try:
+                results = self._remote_batch(students, opportunities, top_n)
+                self._count('remote')
+                return results
+            except (OSError, ProtocolError, struct.error) as e:
+                print(f"Servicio de scoring no disponible, se puntúa en proceso: {e}")
+                self._count('errors')
+                self._unavailable_until = time.monotonic() + self.retry_interval
+
+        self._count('fallback')
+        if self.fallback_engine is None:
+            return [[] for _ in students]
+        return [self.fallback_engine.get_top_recommendations(student, opportunities, top_n) for student in students]
+
+    def daemon_stats(self):
+        """Métricas del demonio (cola y latencia) o None si no está disponible"""
+        if not self.socket_path:
+            return None
+        try:
+            message_type, body = self._request(MSG_STATS, b'')
+            if message_type != MSG_STATS_RESULT:
+                raise ProtocolError(f'respuesta inesperada: {message_type}')
+            return json.loads(body)
+        except (OSError, ProtocolError, ValueError) as e:
+            print(f"Error consultando el servicio de scoring: {e}")
+            return None
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _catalog(self, opportunities):
+        signature = tuple((opportunity.id, getattr(opportunity, 'updated_at', None)) for opportunity in opportunities)
+        cached_signature, key, payload = self._catalog_cache
+        if cached_signature != signature:
+            key = hashlib.blake2b(repr(signature).encode('utf-8'), digest_size=16).digest()
+            payload = serialize_rows(opportunities, CATALOG_COLUMNS)
+            self._catalog_cache = (signature, key, payload)
+        return key, payload
+
+    def _remote_batch(self, students, opportunities, top_n):
+        key, catalog_payload = self._catalog(opportunities)
+        students_payload = serialize_rows(students, STUDENT_FEATURE_COLUMNS)
+
+        def request(catalog):
+            header = SCORE_HEADER.pack(key, top_n, len(catalog), len(students_payload))
+            return self._request(MSG_SCORE, header + catalog + students_payload)
+
+        # El catálogo viaja solo si el demonio no lo tiene todavía
+        message_type, body = request(b'' if key in self._known_catalogs else catalog_payload)
+        if message_type == MSG_CATALOG_MISSING:
+            message_type, body = request(catalog_payload)
+        if message_type == MSG_ERROR:
+            raise ProtocolError(body.decode('utf-8', 'replace'))
+        if message_type != MSG_RESULT:
+            raise ProtocolError(f'respuesta inesperada: {message_type}')
+        self._known_catalogs.add(key)
+
+        by_id = {opportunity.id: opportunity for opportunity in opportunities}
+        return [
+            [
+                {'opportunity': by_id[opportunity_id], 'score': score, 'company': by_id[opportunity_id].company}
+                for opportunity_id, score in items
+            ]
+            for items in decode_results(body)
+        ]
+
+    def _request(self, message_type, body):
+        try:
+            connection = self._connections.get_nowait()
+        except queue.Empty:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self.socket_path)
+            except OSError:
+                connection.close()
+                raise
+
+        try:
+            send_frame(connection, message_type, body)
+            response = recv_frame(connection)
+        except BaseException:
+            # Una conexión a medio leer no se puede reutilizar
+            connection.close()
+            raise
+
+        try:
+            self._connections.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+        return response
+
+def main():
+    parser = argparse.ArgumentParser(description='Demonio de scoring de AIMatchingEngine sobre un socket Unix')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH)
+    parser.add_argument('--workers', type=int, default=None, help='Procesos del pool (por defecto, núcleos)')
+    parser.add_argument('--backend', choices=['full', 'lite'], default=None)
+    parser.add_argument('--stats', action='store_true', help='Muestra las métricas de un demonio en marcha')
+    args = parser.parse_args()
+
+    if args.stats:
+        stats = ScoringClient(args.socket).daemon_stats()
+        if stats is None:
+            sys.exit(1)
+        print(json.dumps(stats, indent=2))
+        return
+
+    server = ScoringServer(args.socket, workers=args.workers, backend=args.backend)
+    print("=" * 60)
+    print(f"SERVICIO DE SCORING en {args.socket} ({server.workers} workers)")
+    print("=" * 60)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Prueba de concurrencia del motor de matching
+
+32 hilos comparten un mismo AIMatchingEngine y llaman en paralelo a recomendaciones,
+similitud semántica por pares y predicción de éxito mientras otro hilo reactiva el modelo
+una y otra vez. Todos los resultados deben coincidir con los de una corrida en un solo hilo.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ai_matching import AIMatchingEngine, RowRecord
+from model_registry import ModelRegistry
+
+N_THREADS = 32
+ROUNDS = 2
+
+SKILLS = ['Python', 'JavaScript', 'SQL', 'React', 'Java', 'Excel', 'Marketing', 'Contabilidad',
+          'Docker', 'Linux', 'Liderazgo', 'Comunicación', 'Trabajo en equipo', 'Estadística']
+CAREERS = ['Ingeniería en Sistemas', 'Ingeniería Industrial', 'Administración', 'Contaduría', 'Mercadotecnia']
+WORDS = ('develop web applications data analysis marketing campaigns finance reports design '
+         'software testing cloud').split()
+
+def generate_data(n_students=25, n_opportunities=150, seed=7):
+    """Estudiantes y oportunidades sintéticos como filas de SQLite"""
+    rng = random.Random(seed)
+
+    students = [RowRecord({
+        'id': student_id, 'first_name': 'Nombre', 'last_name': 'Apellido', 'career': rng.choice(CAREERS),
+        'semester': rng.randint(1, 10), 'credits_percentage': rng.uniform(0, 100), 'gpa': rng.uniform(6, 10),
+        'skills_technical': json.dumps(rng.sample(SKILLS, rng.randint(1, 4))),
+        'skills_soft': json.dumps(rng.sample(SKILLS, rng.randint(0, 2))),
+        'interests': json.dumps(rng.sample(WORDS, rng.randint(0, 3))),
+        'languages': json.dumps(rng.sample(['Español', 'Inglés', 'Francés'], rng.randint(1, 3))),
+        'experience': json.dumps(['Prácticas'] * rng.randint(0, 2)),
+        'is_available': 1, 'updated_at': '2025-01-01 00:00:00'
+    }) for student_id in range(1, n_students + 1)]
+
+    opportunities = [RowRecord({
+        'id': opp_id, 'title': f'Oportunidad {opp_id}', 'description': ' '.join(rng.sample(WORDS, 5)),
+        'type': rng.choice(['internship', 'social_service', 'job']),
+        'required_skills': json.dumps(rng.sample(SKILLS, rng.randint(1, 3))),
+        'required_semester': rng.choice([None, 3, 6]), 'required_credits': rng.choice([None, 50, 70]),
+        'required_careers': json.dumps(rng.sample(CAREERS, rng.randint(0, 2))),
+        'duration_months': rng.choice([None, 3, 6]), 'hours_per_week': rng.choice([None, 20, 40]),
+        'salary': rng.choice([None, 8000.0]), 'benefits': '[]', 'is_active': 1,
+        'updated_at': '2025-01-01 00:00:00'
+    }) for opp_id in range(1, n_opportunities + 1)]
+
+    return students, opportunities
+
+def run_workload(engine, students, opportunities):
+    """Resultados de todas las operaciones de lectura del motor para los datos dados"""
+    results = {}
+    for student in students:
+        recommendations = engine.get_top_recommendations(student, opportunities, top_n=5)
+        results[('top', student.id)] = [(item['opportunity'].id, item['score']) for item in recommendations]
+
+        opportunity = opportunities[student.id % len(opportunities)]
+        student_features, student_text = engine.prepare_student_features(student)
+        _, opportunity_text = engine.prepare_opportunity_features(opportunity)
+        results[('semantic', student.id)] = engine.calculate_semantic_similarity(student_text, opportunity_text)
+        results[('success', student.id)] = engine.predict_success_probability(student, opportunity)
+
+    results['applicants'] = [
+        (item['student'].id, item['score']) for item in engine.rank_applicants(opportunities[0], students)['rankings']
+    ]
+    return results
+
+def test_concurrent_scoring_is_deterministic():
+    students, opportunities = generate_data()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        engine = AIMatchingEngine()
+        engine.model_path = os.path.join(model_dir, 'ai_matching_model.pkl')
+        engine.registry = ModelRegistry(os.path.join(model_dir, 'registry'))
+        engine.ann_enabled = True
+        engine.ann_min_catalog = 100
+
+        rng = random.Random(3)
+        applications = [{
+            'student': rng.choice(students), 'opportunity': rng.choice(opportunities),
+            'status': rng.choice(['accepted', 'rejected'])
+        } for _ in range(400)]
+        assert engine.train_model(applications, param_grid=[{'n_estimators': 20}], cv_folds=2)
+
+        expected = run_workload(engine, students, opportunities)
+        snapshot = engine._snapshot
+
+        # Reactivar el mismo modelo sin parar mientras los hilos puntúan
+        stop = threading.Event()
+
+        def swap_models():
+            while not stop.is_set():
+                engine._swap_artifacts(snapshot.model, snapshot.scaler, snapshot.vectorizer, snapshot.version)
+                engine.catalog_index = None
+                time.sleep(0.001)
+
+        swapper = threading.Thread(target=swap_models)
+        swapper.start()
+        try:
+            with ThreadPoolExecutor(max_workers=N_THREADS) as pool:
+                futures = [
+                    pool.submit(run_workload, engine, students, opportunities)
+                    for _ in range(N_THREADS * ROUNDS)
+                ]
+                outcomes = [future.result() for future in futures]
+        finally:
+            stop.set()
+            swapper.join()
+
+        mismatches = sum(outcome != expected for outcome in outcomes)
+        assert mismatches == 0, f"{mismatches} de {len(outcomes)} corridas concurrentes difieren"
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print(f"PRUEBA DE CONCURRENCIA: {N_THREADS} HILOS SOBRE UN MISMO MOTOR")
+    print("=" * 60)
+    try:
+        test_concurrent_scoring_is_deterministic()
+        print(f"✓ {N_THREADS * ROUNDS} corridas concurrentes idénticas a la corrida en un solo hilo")
+    except AssertionError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
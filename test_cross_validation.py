@@ -0,0 +1,59 @@
+"""
+Prueba de la validación cruzada en procesos (método de arranque spawn)
+
+Un script con efectos al importarse (como app.py, que crea la aplicación Flask) entrena el
+modelo con un pool de dos procesos. Los workers no deben volver a ejecutar ese script: el
+efecto debe ocurrir una sola vez, en el proceso padre.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+SCRIPT = '''
+import sys
+sys.path.insert(0, {root!r})
+
+# Efecto al importarse: se repetiría en cada worker si spawn re-ejecutara este script
+with open({marker!r}, 'a') as f:
+    f.write('x')
+
+from ai_matching import AIMatchingEngine, ModelRegistry
+from test_concurrency import generate_data
+
+if __name__ == '__main__':
+    students, opportunities = generate_data()
+    engine = AIMatchingEngine()
+    engine.registry = ModelRegistry({registry!r})
+    applications = [{{
+        'student': student, 'opportunity': opportunity,
+        'status': 'accepted' if (student.id + opportunity.id) % 3 else 'rejected'
+    }} for student in students for opportunity in opportunities[:10]]
+    assert engine.train_model(applications, param_grid=[{{'n_estimators': 5}}, {{'n_estimators': 10}}],
+                              cv_folds=2, n_jobs=2)
+'''
+
+def test_spawn_workers_do_not_rerun_the_main_script():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        marker = os.path.join(tmp_dir, 'imports.txt')
+        script = os.path.join(tmp_dir, 'train.py')
+        with open(script, 'w') as f:
+            f.write(SCRIPT.format(root=os.path.dirname(os.path.abspath(__file__)), marker=marker,
+                                  registry=os.path.join(tmp_dir, 'registry')))
+
+        result = subprocess.run([sys.executable, script], cwd=tmp_dir, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert 'evaluando en serie' not in result.stdout
+        with open(marker) as f:
+            assert f.read() == 'x'
+        with open(os.path.join(tmp_dir, 'models', 'ai_matching_model_training_report.json')) as f:
+            assert [len(result['fold_scores']) for result in json.load(f)['cross_validation']] == [2, 2]
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("PRUEBA DE VALIDACIÓN CRUZADA EN PROCESOS")
+    print("=" * 60)
+    test_spawn_workers_do_not_rerun_the_main_script()
+    print("✓ Los workers no re-ejecutan el script principal")
@@ -0,0 +1,75 @@
+"""
+Prueba de la consulta por bloques (DatabaseManager.iter_query)
+
+Recorre la misma consulta en cada formato de fila con bloques más chicos que el resultado y
+verifica que devuelve lo mismo que execute_query, que un iterador abandonado a medias
+devuelve su conexión al pool al cerrarse y que un error a mitad del recorrido se propaga.
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database_native import DatabaseManager
+
+def test_iter_query_formats_match_execute_query():
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(tmp_dir, 'stream.db'))
+        db.execute_transaction([
+            ('INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)',
+             [(f'usuario{i}@unrc.edu.mx', 'x', 'student') for i in range(1050)])
+        ])
+        query = 'SELECT id, email, role FROM users WHERE id > ? ORDER BY id'
+        expected = db.execute_query(query, (50,))
+        assert len(expected) == 1000
+
+        assert list(db.iter_query(query, (50,), batch_size=64)) == expected
+        assert list(db.iter_query(query, (50,), batch_size=64, row_format='tuple')) == [
+            tuple(row.values()) for row in expected
+        ]
+
+        records = list(db.iter_query(query, (50,), batch_size=64, row_format='record'))
+        assert [record._asdict() for record in records] == expected
+        assert records[0].email == expected[0]['email'] and not hasattr(records[0], '__dict__')
+
+        blocks = list(db.iter_query(query, (50,), batch_size=300, row_format='columns'))
+        assert [len(block['id']) for block in blocks] == [300, 300, 300, 100]
+        assert sum((block['email'] for block in blocks), []) == [row['email'] for row in expected]
+
+        rows = db.iter_query(query, (50,), batch_size=10)
+        assert next(rows) == expected[0]
+        rows.close()
+        assert db.pool.stats()['in_use'] == 0
+
+        assert list(db.iter_query('SELECT * FROM tabla_inexistente')) == []
+
+        # Un error a mitad del recorrido se propaga en lugar de cortar el resultado en silencio
+        def fail_after(user_id):
+            if user_id > 500:
+                raise ValueError('fila inválida')
+            return user_id
+        with db.pool.connection() as conn:
+            conn.create_function('fail_after', 1, fail_after)
+            rows = db.iter_query('SELECT fail_after(id) AS id FROM users ORDER BY users.id', batch_size=100)
+            seen = []
+            try:
+                for row in rows:
+                    seen.append(row['id'])
+                raise AssertionError('se esperaba un error')
+            except sqlite3.OperationalError:
+                pass
+            assert 0 < len(seen) <= 500 and seen == list(range(1, len(seen) + 1))
+        db.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("PRUEBA DE CONSULTAS POR BLOQUES")
+    print("=" * 60)
+    test_iter_query_formats_match_execute_query()
+    print("✓ Todos los formatos de fila coinciden con execute_query")
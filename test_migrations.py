@@ -0,0 +1,95 @@
+"""
+Prueba de las migraciones del esquema sobre una base creada por una versión anterior
+
+La base tiene las tablas sin las columnas agregadas después (application_deadline,
+updated_at, ...) ni índices; DatabaseManager debe migrarla sin perder datos, registrar la
+versión y dejar que las consultas frecuentes usen los índices nuevos.
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database_native import DatabaseManager
+from migrations import MIGRATIONS, MigrationRunner
+from recommendations import OPEN_OPPORTUNITY_FILTER
+
+OLD_SCHEMA = '''
+    CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT UNIQUE NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE students (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, career TEXT,
+                           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE companies (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE opportunities (id INTEGER PRIMARY KEY AUTOINCREMENT, company_id INTEGER NOT NULL,
+                                required_semester INTEGER, required_credits REAL, is_active BOOLEAN DEFAULT 1,
+                                available_positions INTEGER DEFAULT 1, filled_positions INTEGER DEFAULT 0,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE applications (id INTEGER PRIMARY KEY AUTOINCREMENT, student_id INTEGER NOT NULL,
+                               opportunity_id INTEGER NOT NULL, status TEXT DEFAULT 'pending',
+                               applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, reviewed_at TIMESTAMP);
+    INSERT INTO users (email) VALUES ('estudiante@unrc.edu.mx');
+    INSERT INTO students (user_id, career)
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 500)
+        SELECT i, 'Carrera ' || (i % 7) FROM n;
+    INSERT INTO companies (user_id) VALUES (1);
+    INSERT INTO opportunities (company_id, required_semester, is_active)
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 500)
+        SELECT 1, i % 10, i % 4 != 0 FROM n;
+    INSERT INTO applications (student_id, opportunity_id, status)
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 500)
+        SELECT i, 1, CASE i % 3 WHEN 0 THEN 'accepted' WHEN 1 THEN 'rejected' ELSE 'pending' END FROM n;
+'''
+
+def query_plan(conn, query, params=()):
+    return ' '.join(row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params))
+
+def test_migrates_old_database_in_place():
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        db_path = os.path.join(tmp_dir, 'old.db')
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript(OLD_SCHEMA)
+
+        db = DatabaseManager(db_path)
+        runner = MigrationRunner(db_path)
+        assert runner.current_version() == MIGRATIONS[-1].version
+        assert runner.pending() == []
+        assert runner.run() == []
+
+        conn = sqlite3.connect(db_path)
+        try:
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(opportunities)')]
+            assert 'application_deadline' in columns and 'updated_at' in columns
+            assert conn.execute('SELECT COUNT(*) FROM students WHERE updated_at IS NULL').fetchone() == (0,)
+            assert conn.execute('SELECT COUNT(*) FROM applications WHERE created_at = applied_at').fetchone() == (500,)
+
+            assert 'idx_students_user_id' in query_plan(conn, 'SELECT * FROM students WHERE user_id = ?', (1,))
+            assert 'idx_applications_status' in query_plan(
+                conn, 'SELECT status, COUNT(*) FROM applications GROUP BY status'
+            )
+            assert 'COVERING INDEX idx_students_career' in query_plan(
+                conn, 'SELECT career, COUNT(*) FROM students GROUP BY career'
+            )
+            # La elegibilidad usa el índice parcial de oportunidades abiertas
+            assert 'idx_opportunities_open' in query_plan(
+                conn, f'SELECT id FROM opportunities WHERE {OPEN_OPPORTUNITY_FILTER} AND required_semester <= ?', (5,)
+            )
+        finally:
+            conn.close()
+
+        # El filtro de oportunidades abiertas ya funciona sobre la base migrada
+        assert len(db.execute_query('SELECT id FROM opportunities WHERE application_deadline IS NULL')) == 500
+        db.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("PRUEBA DE MIGRACIONES DEL ESQUEMA")
+    print("=" * 60)
+    test_migrates_old_database_in_place()
+    print("✓ Base anterior migrada sin perder datos")
@@ -0,0 +1,66 @@
+"""
+Prueba de la carga del modelo publicado en el registro
+
+El bosque plano se guarda como arreglos NumPy simples y debe quedar mapeado con mmap al
+cargar la versión; el estimador de sklearn va en su propio archivo y solo se carga cuando
+un lote supera flat_forest_max_rows. Las predicciones deben coincidir con las del motor que
+entrenó el modelo.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ai_matching import AIMatchingEngine
+from model_registry import ModelRegistry
+from test_concurrency import generate_data
+
+def make_engine(model_dir):
+    engine = AIMatchingEngine()
+    engine.model_path = os.path.join(model_dir, 'ai_matching_model.pkl')
+    engine.registry = ModelRegistry(os.path.join(model_dir, 'registry'))
+    return engine
+
+def test_flat_forest_is_memory_mapped_and_estimator_lazy():
+    students, opportunities = generate_data()
+    pairs = [(student, opportunity) for student in students for opportunity in opportunities[:20]]
+
+    with tempfile.TemporaryDirectory() as model_dir, contextlib.redirect_stdout(io.StringIO()):
+        trained = make_engine(model_dir)
+        applications = [{
+            'student': student, 'opportunity': opportunity,
+            'status': 'accepted' if (student.id + opportunity.id) % 3 else 'rejected'
+        } for student, opportunity in pairs]
+        assert trained.train_model(applications, param_grid=[{'n_estimators': 20}], cv_folds=2)
+        assert not os.path.exists(trained.model_path)
+        expected = trained.predict_success_probabilities(pairs)
+
+        engine = make_engine(model_dir)
+        assert engine.load_model(lazy=False)
+        snapshot = engine._snapshot
+        assert snapshot.model is None and os.path.exists(snapshot.estimator_path)
+        assert isinstance(snapshot.flat_forest.value, np.memmap)
+
+        engine.flat_forest_max_rows = len(pairs)
+        assert np.array_equal(engine.predict_success_probabilities(pairs), expected)
+        assert engine._snapshot.model is None
+
+        # Un lote más grande que flat_forest_max_rows usa sklearn y carga el estimador
+        engine.flat_forest_max_rows = 10
+        assert np.array_equal(engine.predict_success_probabilities(pairs), expected)
+        assert engine._snapshot.model is not None
+        assert engine.get_model_info()['model_type'] == 'RandomForestClassifier'
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("PRUEBA DE CARGA DEL MODELO DESDE EL REGISTRO")
+    print("=" * 60)
+    test_flat_forest_is_memory_mapped_and_estimator_lazy()
+    print("✓ Bosque plano mapeado con mmap y estimador cargado solo cuando se necesita")
@@ -0,0 +1,124 @@
+"""
+Prueba de la actualización incremental de recomendaciones y de su lectura
+
+Las oportunidades se crean y se desactivan una por una, notificando cada cambio. Las filas
+guardadas deben coincidir con las de recalcular al estudiante desde cero: la oportunidad que
+sale de la ventana de recientes deja de recomendarse y la que vuelve a entrar se recomienda.
+Los cambios hechos por otro proceso llegan a su índice por el registro catalog_changes.
+Al leer, las oportunidades que se cerraron sin notificar (fecha límite o vacantes) se omiten.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database_native import DatabaseManager, Recommendation
+from recommendations import RecommendationRefresher, SkillIndex
+
+def stored(db):
+    return [row['opportunity_id'] for row in
+            db.execute_query('SELECT opportunity_id FROM recommendations ORDER BY opportunity_id')]
+
+def test_exploration_window_changes_refresh_columns():
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(tmp_dir, 'recommendations.db'))
+        # Sin habilidades en común: solo puede recibir oportunidades de la ventana de exploración
+        student_id = db.execute_insert(
+            '''INSERT INTO students (user_id, first_name, last_name, student_id, career, semester,
+                                     credits_percentage, skills_technical)
+               VALUES (1, 'Ana', 'López', 'S1', 'Sistemas', 5, 50, '["Java"]')'''
+        )
+        recommendations = Recommendation(db)
+        skill_index = SkillIndex(exploration_size=2).load(db)
+        refresher = RecommendationRefresher(db, recommendations, skill_index=skill_index)
+
+        opportunity_ids = []
+        for _ in range(4):
+            opportunity_id = db.execute_insert(
+                '''INSERT INTO opportunities (company_id, title, description, type, required_skills)
+                   VALUES (1, 'Desarrollo', 'Backend', 'internship', '["Python"]')'''
+            )
+            opportunity_ids.append(opportunity_id)
+            db.notify_change('opportunity', opportunity_id)
+        assert stored(db) == opportunity_ids[-2:]
+
+        # Al desactivar la más reciente, la anterior vuelve a la ventana
+        db.execute_update('UPDATE opportunities SET is_active = 0 WHERE id = ?', (opportunity_ids[-1],))
+        db.notify_change('opportunity', opportunity_ids[-1])
+        assert stored(db) == opportunity_ids[1:3]
+
+        incremental = stored(db)
+        refresher.refresh_student(student_id)
+        assert stored(db) == incremental
+        db.close()
+
+def test_changes_from_other_processes_reach_the_index():
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        # Dos DatabaseManager sobre el mismo archivo, como dos workers con su propio índice
+        path = os.path.join(tmp_dir, 'recommendations.db')
+        db_a, db_b = DatabaseManager(path), DatabaseManager(path)
+        student_id = db_a.execute_insert(
+            '''INSERT INTO students (user_id, first_name, last_name, student_id, career, semester,
+                                     credits_percentage, skills_technical)
+               VALUES (1, 'Ana', 'López', 'S1', 'Sistemas', 5, 50, '["Python"]')'''
+        )
+        worker_a = RecommendationRefresher(db_a, Recommendation(db_a),
+                                           skill_index=SkillIndex(exploration_size=0).load(db_a))
+        index_b = SkillIndex(exploration_size=0).load(db_b)
+        worker_b = RecommendationRefresher(db_b, Recommendation(db_b), skill_index=index_b)
+
+        insert = '''INSERT INTO opportunities (company_id, title, description, type, required_skills)
+                    VALUES (1, 'Desarrollo', 'Backend', 'internship', '["Python"]')'''
+        first = db_a.execute_insert(insert)
+        db_a.notify_change('opportunity', first)
+        assert stored(db_a) == [first]
+
+        # El worker B no recibió la notificación: su recálculo no debe perder la oportunidad
+        worker_b.refresh_student(student_id)
+        assert stored(db_b) == [first] and len(index_b) == 1
+
+        # Los cambios sin notify_change también llegan, y un registro ya depurado reconstruye el índice
+        db_a.execute_update('UPDATE opportunities SET is_active = 0 WHERE id = ?', (first,))
+        assert worker_b.sync() and len(index_b) == 0
+        second = db_a.execute_insert(insert)
+        db_a.execute_update('DELETE FROM catalog_changes')
+        third = db_a.execute_insert(insert)
+        assert worker_b.sync() and index_b.candidates(['Python']) == {second, third}
+        assert not worker_b.sync()
+        db_a.close()
+        db_b.close()
+
+def test_closed_opportunities_are_not_served():
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(tmp_dir, 'recommendations.db'))
+        recommendations = Recommendation(db)
+        opportunity_ids = [db.execute_insert(
+            '''INSERT INTO opportunities (company_id, title, description, type, available_positions)
+               VALUES (1, 'Desarrollo', 'Backend', 'internship', 2)'''
+        ) for _ in range(3)]
+        recommendations.replace_for_student(1, [(opportunity_id, 0.5) for opportunity_id in opportunity_ids])
+
+        # Cierres que no notifican ningún cambio: vence la fecha límite y se llenan las vacantes
+        db.execute_update("UPDATE opportunities SET application_deadline = DATE('now', '-1 day') WHERE id = ?",
+                          (opportunity_ids[0],))
+        db.execute_update('UPDATE opportunities SET filled_positions = 2 WHERE id = ?', (opportunity_ids[1],))
+
+        assert [row['id'] for row in recommendations.get_for_student(1)] == opportunity_ids[2:]
+        assert recommendations.count_for_student(1) == 1
+        db.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("PRUEBA DE RECOMENDACIONES INCREMENTALES")
+    print("=" * 60)
+    test_exploration_window_changes_refresh_columns()
+    print("✓ Las filas incrementales coinciden con el cálculo desde cero")
+    test_changes_from_other_processes_reach_the_index()
+    print("✓ Los cambios de catálogo de otro proceso llegan al índice de habilidades")
+    test_closed_opportunities_are_not_served()
+    print("✓ Las oportunidades cerradas no se devuelven aunque sigan guardadas")
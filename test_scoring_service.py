@@ -0,0 +1,66 @@
+"""
+Prueba del servicio de scoring fuera de proceso
+
+Levanta el demonio con un worker sobre un socket temporal y verifica que las recomendaciones
+remotas (en lote y por estudiante, con conexiones reutilizadas) coinciden con las del motor en
+proceso, y que el cliente vuelve a puntuar en proceso cuando el demonio no está disponible.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ai_matching import AIMatchingEngine
+from scoring_service import ScoringClient, ScoringServer, decode_results, encode_results
+from test_concurrency import generate_data
+
+def as_pairs(batches):
+    return [[(item['opportunity'].id, item['score']) for item in batch] for batch in batches]
+
+def test_results_framing_round_trip():
+    results = [[(3, 0.91), (70000, 0.5)], [], [(1, 0.3)]]
+    assert decode_results(encode_results(results)) == results
+
+def test_remote_scoring_matches_in_process():
+    students, opportunities = generate_data(n_students=10, n_opportunities=120)
+    engine = AIMatchingEngine()
+
+    with tempfile.TemporaryDirectory() as socket_dir, contextlib.redirect_stdout(io.StringIO()):
+        server = ScoringServer(os.path.join(socket_dir, 'scoring.sock'), workers=1)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            client = ScoringClient(server.socket_path, fallback_engine=engine)
+            expected = [engine.get_top_recommendations(student, opportunities, top_n=5) for student in students]
+
+            assert as_pairs(client.recommend_batch(students, opportunities, top_n=5)) == as_pairs(expected)
+            single = [client.get_top_recommendations(student, opportunities, top_n=5) for student in students]
+            assert as_pairs(single) == as_pairs(expected)
+            assert single[0][0]['opportunity'] is expected[0][0]['opportunity']
+            assert client.stats == {'remote': 1 + len(students), 'fallback': 0, 'errors': 0}
+
+            stats = client.daemon_stats()
+            assert stats['requests'] == 1 + len(students) and stats['queue_depth'] == 0
+            assert set(stats['latency_ms']) == {'p50', 'p95', 'p99', 'max'}
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # Sin demonio se puntúa en proceso
+        client = ScoringClient(os.path.join(socket_dir, 'missing.sock'), fallback_engine=engine)
+        assert as_pairs([client.get_top_recommendations(students[0], opportunities, top_n=5)]) == as_pairs(expected[:1])
+        assert client.stats == {'remote': 0, 'fallback': 1, 'errors': 1}
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("PRUEBA DEL SERVICIO DE SCORING")
+    print("=" * 60)
+    test_results_framing_round_trip()
+    test_remote_scoring_matches_in_process()
+    print("✓ Recomendaciones remotas idénticas a las del motor en proceso")
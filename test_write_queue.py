@@ -0,0 +1,97 @@
+"""
+Prueba del hilo escritor único (WriteQueue) de DatabaseManager
+
+Varios hilos registran usuarios a la vez con las escrituras encoladas: todas deben aplicarse
+agrupadas en menos transacciones que escrituras, un error (email duplicado) solo debe afectar
+a su propia escritura y una escritura anidada dentro de una conexión del pool no debe esperar
+al escritor. Un error que no es de SQLite tampoco debe dejar colgadas las escrituras.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database_native import DatabaseManager
+
+def test_concurrent_writes_are_group_committed():
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(tmp_dir, 'queue.db'), profile='wal_durable', write_queue=True)
+        results = []
+
+        def register(worker):
+            for i in range(50):
+                results.append(db.execute_insert(
+                    'INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)',
+                    (f'{worker}-{i}@unrc.edu.mx', 'x', 'student')
+                ))
+
+        threads = [threading.Thread(target=register, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 400 and all(results) and len(set(results)) == 400
+        stats = db.write_queue.stats()
+        assert stats['writes'] == 400 and stats['failed'] == 0
+        assert stats['batches'] < stats['writes']
+
+        # El duplicado falla solo; la escritura siguiente se aplica
+        assert db.execute_insert('INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)',
+                                 ('0-0@unrc.edu.mx', 'x', 'student')) == 0
+        assert db.execute_transaction([
+            ('UPDATE users SET is_active = 0 WHERE id = ?', [(user_id,) for user_id in results[:10]])
+        ])
+        with db.pool.connection():
+            assert db.execute_update('UPDATE users SET is_active = 0 WHERE id = ?', (results[10],)) == 1
+
+        assert db.execute_query('SELECT COUNT(*) AS n FROM users WHERE is_active = 0') == [{'n': 11}]
+        assert db.write_queue.stats()['failed'] == 1
+        db.close()
+
+def test_writer_survives_unexpected_errors():
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(tmp_dir, 'queue.db'), write_queue=True)
+        insert = 'INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)'
+
+        # Un entero de más de 64 bits (OverflowError, no sqlite3.Error) falla solo
+        assert db.execute_update('UPDATE users SET is_active = ? WHERE id = 1', (2 ** 70,)) == 0
+        assert db.execute_insert(insert, ('despues@unrc.edu.mx', 'x', 'student')) == 1
+
+        # Si el hilo terminó, la siguiente escritura lo vuelve a arrancar
+        db.write_queue.queue.put(None)
+        db.write_queue.thread.join()
+        assert db.execute_insert(insert, ('reiniciado@unrc.edu.mx', 'x', 'student')) > 0
+        stats = db.write_queue.stats()
+        assert stats['running'] and stats['restarts'] == 1
+
+        # Una escritura cuya espera venció antes de que el escritor la tome no se aplica
+        db.write_queue.timeout = 0.5
+        apply_batch = db.write_queue._apply_batch
+        taken, blocker = threading.Event(), threading.Event()
+        db.write_queue._apply_batch = lambda conn, batch: (taken.set(), blocker.wait(), apply_batch(conn, batch))
+        # La escritura lenta se espera por su Future (sin timeout) para saber cuándo se confirmó
+        slow = db.write_queue.submit([(insert, ('lento@unrc.edu.mx', 'x', 'student'))], 'lastrowid')
+        taken.wait()
+        assert db.execute_insert(insert, ('vencido@unrc.edu.mx', 'x', 'student')) == 0
+        blocker.set()
+        assert slow.result() > 0
+        db.write_queue._apply_batch = apply_batch
+        emails = [row['email'] for row in db.execute_query('SELECT email FROM users ORDER BY id')]
+        assert emails == ['despues@unrc.edu.mx', 'reiniciado@unrc.edu.mx', 'lento@unrc.edu.mx']
+        db.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("PRUEBA DEL HILO ESCRITOR ÚNICO")
+    print("=" * 60)
+    test_concurrent_writes_are_group_committed()
+    print("✓ Escrituras concurrentes aplicadas con commit agrupado")
+    test_writer_survives_unexpected_errors()
+    print("✓ El escritor sobrevive a errores inesperados y se reinicia si muere")